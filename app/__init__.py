@@ -1,20 +1,31 @@
-import time
+import os
 
-from fastapi import FastAPI, Request, Response, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, status
 from fastapi.exceptions import HTTPException, RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 
 from contextlib import asynccontextmanager
 
 from fastapi_pagination.api import _add_pagination
 
-from loguru import logger
-
 from app.api import init_router
-from app.models import init_mongoengine, disconnect_mongoengine
+from app.models import (
+    init_mongoengine,
+    disconnect_mongoengine,
+    ping,
+    init_motor,
+    disconnect_motor,
+)
 from app.core.app import get_app_settings, AppSettings
+from app.core.compression import CompressionMiddleware
+from app.core.executor import run_db, shutdown_executors
+from app.core.metrics import MetricsMiddleware, metrics, shutdown_metrics
+from app.core.middleware import (
+    DBMonitoringMiddleware,
+    ProcessTimeMiddleware,
+    ServerTimingMiddleware,
+)
+from app.core.responses import FastJSONResponse
 
 from app.utils.http_error import http_error_handler
 from app.utils.validation_error import http422_error_handler
@@ -29,15 +40,28 @@ def create_app() -> FastAPI:
         # on app start up
         await init_router(app, settings)
         await init_mongoengine(settings)
+        if settings.DB_ASYNC_ENABLED:
+            await init_motor(settings)
         _add_pagination(app)
+        app.state.ready = True
         yield
         # on app shutdown
+        app.state.ready = False
+        await disconnect_motor()
         await disconnect_mongoengine()
+        shutdown_executors()
+        shutdown_metrics()
 
     app = FastAPI(**settings.fastapi_kwargs)
     app.add_exception_handler(HTTPException, http_error_handler)
     app.add_exception_handler(RequestValidationError, http422_error_handler)
-    app.add_middleware(GZipMiddleware, minimum_size=1000)  # Allow accept gzip encoding
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        encodings=settings.COMPRESSION_ENCODINGS,
+        levels=settings.COMPRESSION_LEVELS,
+        static_paths=settings.COMPRESSION_STATIC_PATHS,
+    )
     app.add_middleware(
         CORSMiddleware,
         allow_credentials=settings.ALLOW_CREDENTIALS,
@@ -45,31 +69,43 @@ def create_app() -> FastAPI:
         allow_methods=settings.ALLOW_METHODS,
         allow_headers=settings.ALLOW_HEADERS,
     )
+    app.add_middleware(ProcessTimeMiddleware, disallow_agents=settings.DISALLOW_AGENTS)
+    if settings.SERVER_TIMING_ENABLED:
+        app.add_middleware(
+            ServerTimingMiddleware,
+            log_sample_rate=settings.SERVER_TIMING_LOG_SAMPLE_RATE,
+        )
+    if settings.DB_COMMAND_MONITORING:
+        app.add_middleware(
+            DBMonitoringMiddleware,
+            max_commands=settings.DB_MAX_COMMANDS_PER_REQUEST,
+        )
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+        # an APIRoute sets scope["route"], scrapes are labelled with the path
+        app.get(settings.METRICS_PATH, tags=["Root"], include_in_schema=False)(metrics)
     app.router.lifespan_context = lifespan
-
-    @app.middleware("http")
-    async def add_process_time_header(request: Request, call_next):
-        user_agent = request.headers.get("user-agent", "")
-        logger.debug(f"user-agent ==> {user_agent}")
-        for agent in settings.DISALLOW_AGENTS:
-            if agent in user_agent.lower():
-                logger.warning({"detail": "Client is not allow to uses."})
-
-                return JSONResponse(
-                    status_code=status.HTTP_406_NOT_ACCEPTABLE,
-                    content={"detail": "Client is not allow to uses."},
-                )
-
-        start_time = time.time()
-        response: Response = await call_next(request)
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = "{:0.6f}".format(process_time)
-        return response
+    app.state.ready = False
 
     @app.get("/", tags=["Root"])
     async def root():
         return {"message": "service is working"}
 
+    @app.get(settings.READINESS_PATH, tags=["Root"], include_in_schema=False)
+    async def ready():
+        # answered by the worker that got the request, for its own DB client
+        content = {"pid": os.getpid()}
+        if app.state.ready:
+            try:
+                await run_db(ping)
+                return {"status": "ready", **content}
+            except Exception as e:
+                content["detail"] = str(e)
+        return FastJSONResponse(
+            {"status": "not ready", **content},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
     return app
 
 
@@ -0,0 +1,86 @@
+"""Production entrypoint: uvicorn with one worker process per CPU
+
+    python -m app
+    python -m app --workers 4 --loop uvloop --http httptools
+
+Workers are spawned processes that import the app on their own, so each one
+runs the lifespan and opens its own Mongo connections. SIGTERM/SIGINT stop
+accepting connections and give in-flight requests up to
+`GRACEFUL_SHUTDOWN_TIMEOUT` seconds before the lifespan shutdown runs.
+"""
+import argparse
+import math
+import os
+import shutil
+import tempfile
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, capped by a cgroup v2 CPU quota
+
+    `os.cpu_count()` counts the host CPUs, a container limited by its CPU set
+    or quota would run more workers than it has cores."""
+    cpus = len(os.sched_getaffinity(0))
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+
+def prepare_metrics_directory(workers: int) -> None:
+    # workers aggregate their Prometheus samples through a shared directory
+    if workers < 2 or "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        return
+    directory = os.path.join(tempfile.gettempdir(), f"prometheus-{os.getpid()}")
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.WORKERS or available_cpus(),
+        help="worker processes, defaults to WORKERS or the CPU count",
+    )
+    parser.add_argument(
+        "--loop", choices=["auto", "asyncio", "uvloop"], default=settings.SERVER_LOOP
+    )
+    parser.add_argument(
+        "--http", choices=["auto", "h11", "httptools"], default=settings.SERVER_HTTP
+    )
+    parser.add_argument(
+        "--graceful-shutdown-timeout",
+        type=int,
+        default=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+    )
+    args = parser.parse_args()
+
+    prepare_metrics_directory(args.workers)
+    uvicorn.run(
+        "app:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=args.loop,
+        http=args.http,
+        timeout_graceful_shutdown=args.graceful_shutdown_timeout,
+        proxy_headers=True,
+        log_config=None,  # logging is configured by the app (loguru)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import importlib
+import json
 import pathlib
 
 from fastapi.exceptions import RequestValidationError
@@ -8,39 +9,60 @@ from loguru import logger
 from app.utils.http_error import http_error_handler
 from app.utils.validation_error import http422_error_handler
 
+API_DIRECTORY = pathlib.Path(__file__).parent
+MANIFEST_PATH = API_DIRECTORY / "routers.json"
+
 
 async def init_router(app, settings):
     app.add_exception_handler(HTTPException, http_error_handler)
     app.add_exception_handler(RequestValidationError, http422_error_handler)
 
-    current_directory = pathlib.Path(__file__).parent
-    routers = await get_subrouters(current_directory)
+    # the manifest skips walking and inspecting app/api, DEBUG always walks
+    # so new route modules are picked up without rebuilding it
+    if MANIFEST_PATH.exists() and not settings.DEBUG:
+        manifest = json.loads(MANIFEST_PATH.read_text())
+    else:
+        logger.info(f"Router manifest not used, walking {API_DIRECTORY}")
+        manifest = walk_routers(API_DIRECTORY)
 
+    routers = load_routers(manifest)
     logger.info(f"routers {[(lambda r: r.prefix)(r) for r in routers]}")
     for router in routers:
-        # logger.debug(f"{router.tags}")
         app.include_router(router, prefix=f"{settings.API_PREFIX}", tags=router.tags)
 
 
-async def get_subrouters(directory):
+def load_routers(manifest: list[dict]) -> list:
+    """Import the routers listed in a manifest and include the nested ones"""
     routers = []
+    for entry in manifest:
+        router = importlib.import_module(entry["module"]).router
+        for subrouter in load_routers(entry["include"]):
+            router.include_router(subrouter)
+        routers.append(router)
+    return routers
+
 
+def walk_routers(directory: pathlib.Path) -> list[dict]:
+    """Manifest of the modules defining a `router` under `directory`
+
+    A package `router` includes the routers found below it, routers of
+    packages without one are moved up a level. Written to `routers.json` by
+    `scripts/build-router-manifest.py`."""
     package = directory.parts[len(pathlib.Path.cwd().parts) :]
-    parent_router = None
+    parent = None
 
     try:
         pymod_file = f"{'.'.join(package)}"
         pymod = importlib.import_module(pymod_file)
 
         if "router" in dir(pymod):
-            parent_router = pymod.router
-            routers.append(parent_router)
+            parent = {"module": pymod_file, "include": []}
     except Exception as e:
         logger.exception(e)
-        return routers
+        return []
 
-    subrouters = []
-    for module in directory.iterdir():
+    entries = []
+    for module in sorted(directory.iterdir()):
         if "__" == module.name[:2]:
             continue
 
@@ -50,19 +72,15 @@ async def get_subrouters(directory):
                 pymod = importlib.import_module(pymod_file)
 
                 if "router" in dir(pymod):
-                    subrouters.append(pymod.router)
+                    entries.append({"module": pymod_file, "include": []})
             except Exception as e:
                 logger.exception(e)
 
         elif module.is_dir():
-            subrouters.extend(await get_subrouters(module))
+            entries.extend(walk_routers(module))
 
-    logger.info(f"router {[(lambda r: r.prefix)(r) for r in subrouters]}")
-    for router in subrouters:
-        # logger.debug(f"router {router.prefix}")
-        if parent_router:
-            parent_router.include_router(router)
-        else:
-            routers.append(router)
+    if parent is None:
+        return entries
 
-    return routers
+    parent["include"] = entries
+    return [parent]
@@ -1,38 +1,218 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, Request, Response
 from app import models
+from app.core.config import settings
+from app.core.etag import is_not_modified, make_etag, not_modified
+from app.core.executor import run_db
+from app.core.export import ExportFormat, export_response
+from app.core.pagination import (
+    CursorPage,
+    CursorParams,
+    fingerprint,
+    page_fingerprint,
+    paginate,
+    paginate_by_cursor,
+    paginate_raw,
+)
+from app.core.projection import Projection
+from app.core.query_cache import get_query_cache
+from app.core.responses import FastJSONResponse
+from app.core.timing import TimedRoute
 from app.services import HouseService
-from app.schemas.house_schema import ResponseHouse, BaseHouse, FindHouse
+from app.schemas import BulkResult
+from app.schemas.house_schema import ResponseHouse, BaseHouse, FindHouse, PatchHouseItem
+from app.utils.search import search_key
 from typing import List, Optional, Annotated
-from fastapi_pagination import Page
-from fastapi_pagination.ext.mongoengine import paginate
+from fastapi_pagination import Page, set_page
+from fastapi_pagination.api import resolve_params
 
-router = APIRouter(tags=["house"], prefix="/house")
+router = APIRouter(tags=["house"], prefix="/house", route_class=TimedRoute)
 
 
 @router.get("/", response_model=Page[ResponseHouse])
 async def house(
+    request: Request,
     house_service: Annotated[HouseService, Depends(HouseService)],
     find_house: FindHouse = Depends(),
+    projection: Projection = Depends(),
 ):
-    houses = house_service.find_house(schema=find_house)
-    return paginate(houses)
+    params = resolve_params().to_raw_params()
+    query_cache = get_query_cache()
+    if query_cache is not None:
+        find = find_house.model_dump(exclude_defaults=True)
+        if "name" in find:
+            find["name"] = search_key(find["name"], settings.SEARCH_MODE)
+        cache_key = await run_db(
+            query_cache.key,
+            request.scope["route"].path_format,
+            models.House._get_collection_name(),
+            {
+                "find": find,
+                "fields": projection.fields,
+                "limit": params.limit,
+                "offset": params.offset,
+            },
+        )
+        cached = await run_db(query_cache.response, request, cache_key)
+        if cached is not None:
+            return cached
+
+    houses = await run_db(
+        house_service.find_house,
+        schema=find_house,
+        # updated_date is part of the ETag
+        projection=[*projection.fields, "updated_date"],
+        raw=settings.DB_RAW_READS,
+    )
+    if request.headers.get("if-none-match"):
+        etag = make_etag(
+            ResponseHouse.__name__,
+            projection.fields,
+            *await run_db(page_fingerprint, houses),
+        )
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+
+    rows = []
+
+    def keep_rows(items: list[dict]) -> list[dict]:
+        rows.extend(items)
+        return items
+
+    paginate_houses = paginate_raw if settings.DB_RAW_READS else paginate
+    with set_page(Page[projection.model]):
+        page = await run_db(paginate_houses, houses, transformer=keep_rows)
+    # from the rows that were fetched, without a second count and find
+    etag = make_etag(
+        ResponseHouse.__name__,
+        projection.fields,
+        *fingerprint(page.total, params, rows),
+    )
+    # items are validated while the page is created, skip response_model
+    response = FastJSONResponse(page, headers={"ETag": etag})
+    if query_cache is not None:
+        await run_db(query_cache.set, cache_key, etag, response.body)
+    return response
+
+
+@router.get("/cursor", response_model=CursorPage[ResponseHouse])
+async def house_by_cursor(
+    house_service: Annotated[HouseService, Depends(HouseService)],
+    find_house: FindHouse = Depends(),
+    params: CursorParams = Depends(),
+    projection: Projection = Depends(),
+):
+    houses = await run_db(
+        house_service.find_house,
+        schema=find_house,
+        projection=projection.fields,
+        raw=settings.DB_RAW_READS,
+    )
+    page = await run_db(paginate_by_cursor, houses, params)
+    return FastJSONResponse(CursorPage[projection.model].model_validate(page))
+
+
+@router.get("/export")
+async def export_house(
+    request: Request,
+    house_service: Annotated[HouseService, Depends(HouseService)],
+    find_house: FindHouse = Depends(),
+    format: ExportFormat = "ndjson",
+):
+    houses = await run_db(
+        house_service.find_house,
+        schema=find_house,
+        projection=list(ResponseHouse.model_fields),
+        raw=True,
+    )
+    return export_response(
+        request,
+        houses,
+        ResponseHouse,
+        format,
+        batch_size=settings.EXPORT_BATCH_SIZE,
+        filename="houses",
+    )
 
 
 @router.post("/create", response_model=ResponseHouse)
 async def create_house(
     house: BaseHouse, house_service: Annotated[HouseService, Depends(HouseService)]
 ):
-    house = house_service.create(house)
+    house = await run_db(house_service.create, house)
     return house
 
 
+@router.post("/bulk/create", response_model=BulkResult)
+async def bulk_create_house(
+    houses: Annotated[list[BaseHouse], Body(max_length=settings.BULK_MAX_ITEMS)],
+    house_service: Annotated[HouseService, Depends(HouseService)],
+):
+    items = await run_db(house_service.bulk_create, houses)
+    return BulkResult.from_items(items)
+
+
+@router.patch("/bulk", response_model=BulkResult)
+async def bulk_update_house(
+    houses: Annotated[list[PatchHouseItem], Body(max_length=settings.BULK_MAX_ITEMS)],
+    house_service: Annotated[HouseService, Depends(HouseService)],
+):
+    items = await run_db(
+        house_service.bulk_patch, [(item.id, item.house) for item in houses]
+    )
+    return BulkResult.from_items(items)
+
+
+@router.post("/bulk/delete", response_model=BulkResult)
+async def bulk_delete_house(
+    house_ids: Annotated[list[str], Body(max_length=settings.BULK_MAX_ITEMS)],
+    house_service: Annotated[HouseService, Depends(HouseService)],
+):
+    items = await run_db(house_service.bulk_delete, house_ids)
+    return BulkResult.from_items(items)
+
+
+@router.get("/{house_id}", response_model=ResponseHouse)
+async def get_house(
+    house_id: str,
+    request: Request,
+    response: Response,
+    house_service: Annotated[HouseService, Depends(HouseService)],
+    projection: Projection = Depends(),
+):
+    if request.headers.get("if-none-match"):
+        version = await run_db(house_service.get_version, house_id)
+        etag = make_etag(ResponseHouse.__name__, projection.fields, house_id, version)
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+
+    house = await run_db(
+        house_service.get_by_id,
+        house_id,
+        # updated_date is part of the ETag
+        [*projection.fields, "updated_date"],
+        settings.DB_RAW_READS,
+    )
+    version = (
+        house.get("updated_date")
+        if isinstance(house, dict)
+        else getattr(house, "updated_date", None)
+    )
+    etag = make_etag(ResponseHouse.__name__, projection.fields, house_id, version)
+    if not projection.is_sparse:
+        response.headers["ETag"] = etag
+        return house
+
+    house = projection.model.model_validate(house)
+    return FastJSONResponse(house, headers={"ETag": etag})
+
+
 @router.patch("/{house_id}", response_model=ResponseHouse)
 async def update_house(
     house_id: str,
     house: BaseHouse,
     house_service: Annotated[HouseService, Depends(HouseService)],
 ):
-    house = house_service.patch(house_id, house)
+    house = await run_db(house_service.patch, house_id, house)
     return house
 
 
@@ -40,5 +220,5 @@ async def update_house(
 async def delete_house(
     house_id: str, house_service: Annotated[HouseService, Depends(HouseService)]
 ):
-    house = house_service.delete_by_id(house_id)
+    house = await run_db(house_service.delete_by_id, house_id)
     return house
@@ -6,7 +6,8 @@ from functools import lru_cache
 from loguru import logger
 
 from app.core.logging import InterceptHandler
-from app.core.config import Settings
+from app.core.config import Settings, settings
+from app.core.responses import FastJSONResponse
 
 
 class AppSettings(Settings):
@@ -20,6 +21,7 @@ class AppSettings(Settings):
             "redoc_url": self.REDOC_URL,
             "title": self.TITLE,
             "version": self.VERSION,
+            "default_response_class": FastJSONResponse,
         }
 
     def configure_logging(self) -> None:
@@ -33,5 +35,6 @@ class AppSettings(Settings):
 
 @lru_cache
 def get_app_settings() -> AppSettings:
-    config = AppSettings()
+    # reuse the validated `settings` instead of reading the env files again
+    config = AppSettings.model_construct(**settings.model_dump())
     return config
@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.core.metrics import observe_cache
+
+MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds
+
+    Values loaded after a miss are stored with `reserve`/`fill`, so a value
+    read before a concurrent `pop` of its key is not cached afterwards."""
+
+    def __init__(self, maxsize: int, ttl: float, name: str = ""):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        # key -> [pop count, pending fills], only while fills are pending
+        self._fills: dict[Hashable, list[int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                observe_cache(self.name, hit=True)
+                return entry[1]
+
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            observe_cache(self.name, hit=False)
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._set(key, value)
+
+    def _set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def reserve(self, key: Hashable) -> int:
+        """Start loading `key`, pass the returned version to `fill`"""
+        with self._lock:
+            fill = self._fills.setdefault(key, [0, 0])
+            fill[1] += 1
+            return fill[0]
+
+    def fill(self, key: Hashable, value: Any, version: int) -> bool:
+        """Store `value` unless `key` was popped since `reserve`
+
+        Every `reserve` needs a `fill`, pass `MISSING` when loading failed."""
+        with self._lock:
+            fill = self._fills[key]
+            fill[1] -= 1
+            if not fill[1]:
+                del self._fills[key]
+
+            if value is MISSING or fill[0] != version:
+                return False
+            self._set(key, value)
+            return True
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            if key in self._fills:
+                self._fills[key][0] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+caches: dict[str, TTLCache] = {}
+
+
+def get_cache(name: str, maxsize: int, ttl: float) -> TTLCache:
+    """Process wide cache registry, repositories are created per request"""
+    cache = caches.get(name)
+    if cache is None:
+        cache = caches.setdefault(name, TTLCache(maxsize=maxsize, ttl=ttl, name=name))
+    return cache
@@ -0,0 +1,244 @@
+import abc
+import zlib
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+class Compressor(abc.ABC):
+    """Streaming compressor, every `compress` call returns a flushed block"""
+
+    @abc.abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    @abc.abstractmethod
+    def finish(self) -> bytes:
+        ...
+
+
+class GzipCompressor(Compressor):
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor(Compressor):
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor(Compressor):
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+COMPRESSORS: dict[str, Callable[[int], Compressor]] = {"gzip": GzipCompressor}
+if brotli is not None:
+    COMPRESSORS["br"] = BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS["zstd"] = ZstdCompressor
+
+
+def negotiate(accept_encoding: str, preference: list[str]) -> str | None:
+    """Pick the encoding with the best client q-value, ties by server preference"""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in preference:
+        if encoding not in COMPRESSORS:
+            continue
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith("text/") or media_type.endswith(
+        ("json", "xml", "javascript")
+    )
+
+
+class CompressionMiddleware:
+    """Negotiated br/zstd/gzip compression of text and JSON responses
+
+    Compression levels are picked per media type and encoding from `levels`,
+    falling back to the "default" entry for encodings a media type omits.
+    Streaming responses are compressed and flushed chunk by chunk, single
+    body responses below `minimum_size` are sent as is.
+    GET responses of `static_paths` (e.g. `/openapi.json`) are compressed once
+    per encoding with the "static" levels and then served from memory."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        encodings: list[str],
+        levels: dict[str, dict[str, int]],
+        static_paths: list[str],
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = encodings
+        self.levels = levels
+        self.static_paths = set(static_paths)
+        self.static_responses: dict[tuple[str, str], tuple[Message, bytes]] = {}
+
+    def level(self, content_type: str, encoding: str) -> int:
+        media_type = content_type.split(";", 1)[0].strip().lower()
+        levels = self.levels.get(media_type) or {}
+        return levels.get(encoding, self.levels["default"][encoding])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+        elif scope["method"] == "GET" and scope["path"] in self.static_paths:
+            await self.send_static(scope, receive, send, encoding)
+        else:
+            await CompressionResponder(self, encoding, send)(scope, receive)
+
+    async def send_static(
+        self, scope: Scope, receive: Receive, send: Send, encoding: str
+    ) -> None:
+        key = (scope["path"], encoding)
+        cached = self.static_responses.get(key)
+        if cached is None:
+            start, chunks = None, []
+
+            async def capture(message: Message) -> None:
+                nonlocal start
+                if message["type"] == "http.response.start":
+                    start = message
+                elif message["type"] == "http.response.body":
+                    chunks.append(message.get("body", b""))
+
+            await self.app(scope, receive, capture)
+            headers = MutableHeaders(scope=start)
+            if start["status"] != 200 or "content-encoding" in headers:
+                await send(start)
+                await send({"type": "http.response.body", "body": b"".join(chunks)})
+                return
+
+            compressor = COMPRESSORS[encoding](self.level("static", encoding))
+            body = compressor.compress(b"".join(chunks)) + compressor.finish()
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            cached = self.static_responses[key] = (start, body)
+
+        start, body = cached
+        # outer middlewares append headers to the message in place
+        await send({**start, "headers": list(start["headers"])})
+        await send({"type": "http.response.body", "body": body})
+
+
+class CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Message | None = None
+        self.compressor: Compressor | None = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers or not is_compressible(
+                headers.get("content-type", "")
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                # held until the first body chunk tells whether to compress
+                self.start = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            headers = MutableHeaders(scope=self.start)
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+
+            content_type = headers.get("content-type", "")
+            level = self.middleware.level(content_type, self.encoding)
+            self.compressor = COMPRESSORS[self.encoding](level)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(self.start)
+
+        data = self.compressor.compress(body) if body else b""
+        if not more_body:
+            data += self.compressor.finish()
+        await self.send(
+            {"type": "http.response.body", "body": data, "more_body": more_body}
+        )
@@ -1,4 +1,4 @@
-from typing import List, Tuple
+from typing import List, Literal, Optional, Tuple
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import logging
 import os
@@ -40,15 +40,56 @@ class Settings(BaseSettings):
         "{db_engine}://{user}:{password}@{host}:{port}/{database}"
     )
     DATABASE_URI: str = ""
+    DB_MAX_POOL_SIZE: int = 100
+    DB_MIN_POOL_SIZE: int = 0
+    DB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None  # None waits for a connection
+    DB_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    # wire compression, "zstd" needs zstandard and "snappy" python-snappy
+    DB_COMPRESSORS: List[Literal["zstd", "snappy", "zlib"]] = []
+    # open DB_MIN_POOL_SIZE connections and ping at startup
+    DB_WARM_UP: bool = False
+    # motor client of the async repositories, a second connection pool
+    DB_ASYNC_ENABLED: bool = False
+    # "inline" runs repository calls on the event loop, "threadpool" on a
+    # bounded thread pool sized like the connection pool
+    DB_EXECUTION_MODE: Literal["inline", "threadpool"] = "inline"
+    DB_THREAD_POOL_SIZE: int = 0  # 0 -> DB_MAX_POOL_SIZE
+    # reconcile model indexes at startup, "dry-run" only logs the plan. Builds
+    # run once per deploy with `scripts/indexes.py create|apply`, "create" and
+    # "apply" here build in every worker and block its startup meanwhile
+    INDEX_SYNC_MODE: Literal["off", "create", "dry-run", "apply"] = "dry-run"
+    INDEX_DROP_UNDECLARED: bool = False
+    # command monitoring: slow query log and per request command count warning
+    DB_COMMAND_MONITORING: bool = True
+    DB_SLOW_QUERY_MS: float = 100.0
+    DB_MAX_COMMANDS_PER_REQUEST: int = 20  # getMore not counted, 0 disables
 
     # auth
     SECRET_KEY: str = "secret_key"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10  # 10 mins
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 30 * 24 * 60  # 30 days
     OTP_INTERVAL: int = 30
+    # bcrypt runs on a dedicated process pool
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    # verified token -> user cache, per process: a token reissued or revoked
+    # on another worker is accepted here for up to TOKEN_CACHE_TTL
+    TOKEN_CACHE_ENABLED: bool = False
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL: float = 30.0
 
     API_PREFIX: str = "/api"
 
+    # server, see `python -m app --help`
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8080
+    WORKERS: int = 0  # 0 -> one per available CPU (affinity, cgroup quota)
+    SERVER_LOOP: Literal["auto", "asyncio", "uvloop"] = "auto"
+    SERVER_HTTP: Literal["auto", "h11", "httptools"] = "auto"
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = 30  # seconds to finish in-flight requests
+    READINESS_PATH: str = "/ready"
+
     # CORS
     ALLOW_CREDENTIALS: bool = True
     ALLOW_HOSTS: List[str] = ["*"]
@@ -62,13 +103,59 @@ class Settings(BaseSettings):
         "python-requests",
     ]
 
+    # response compression, br/zstd need the optional brotli/zstandard packages
+    COMPRESSION_MIN_SIZE: int = 1000
+    COMPRESSION_ENCODINGS: List[str] = ["br", "zstd", "gzip"]  # server preference
+    # levels per media type, "static" ones are used for COMPRESSION_STATIC_PATHS
+    COMPRESSION_LEVELS: dict = {
+        "default": {"br": 4, "zstd": 3, "gzip": 6},
+        "application/x-ndjson": {"br": 1, "zstd": 1, "gzip": 1},
+        "text/csv": {"br": 1, "zstd": 1, "gzip": 1},
+        "static": {"br": 11, "zstd": 19, "gzip": 9},
+    }
+    # GET responses that never change, compressed once and served from memory
+    COMPRESSION_STATIC_PATHS: List[str] = ["/openapi.json"]
+
+    # per-layer Server-Timing header, optionally logged for a share of requests.
+    # Every client sees the timings, enable it for debugging or internal APIs
+    SERVER_TIMING_ENABLED: bool = False
+    SERVER_TIMING_LOG_SAMPLE_RATE: float = 0.0
+
+    # Prometheus exposition, set PROMETHEUS_MULTIPROC_DIR with several workers
+    METRICS_ENABLED: bool = True
+    METRICS_PATH: str = "/metrics"
+
     LOGGING_LEVEL: int = logging.INFO
     LOGGERS: Tuple[str, str] = ("uvicorn.asgi", "uvicorn.access")
 
     # find query
+    DB_RAW_READS: bool = True  # read-only routes validate raw BSON dicts
+    # "regex" scans, "prefix"/"ngram" use the derived indexed search fields
+    # (run scripts/backfill-search.py once before switching)
+    SEARCH_MODE: Literal["regex", "prefix", "ngram"] = "regex"
     DEFAULT_PAGE_SIZE: int = 50
     MAX_PAGE_SIZE: int = 100
 
+    # repository get_by_id cache, per process: writes on another worker are
+    # only seen here once the entry expires after REPOSITORY_CACHE_TTL
+    REPOSITORY_CACHE_ENABLED: bool = False
+    REPOSITORY_CACHE_SIZE: int = 1024
+    REPOSITORY_CACHE_TTL: float = 5.0
+
+    # list response cache, entries are keyed by a per collection version that
+    # repository writes bump. "memory" versions are per worker, a write is only
+    # seen by the other workers after QUERY_CACHE_TTL, "redis" is shared
+    QUERY_CACHE_BACKEND: Literal["off", "memory", "redis"] = "off"
+    QUERY_CACHE_SIZE: int = 1024
+    QUERY_CACHE_TTL: float = 5.0
+    QUERY_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+
+    # bulk write
+    BULK_MAX_ITEMS: int = 10000
+
+    # streaming export, documents fetched and encoded per cursor batch
+    EXPORT_BATCH_SIZE: int = 1000
+
     # date
     DATETIME_FORMAT: str = "%Y-%m-%dT%H:%M:%S"
     DATE_FORMAT: str = "%Y-%m-%d"
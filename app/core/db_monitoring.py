@@ -0,0 +1,264 @@
+import contextvars
+import threading
+import time
+from collections import Counter
+from typing import Any
+
+from loguru import logger
+from pymongo import monitoring
+
+from app.core.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CONNECTIONS,
+    DB_POOL_WAIT,
+    DB_POOL_WAITERS,
+)
+
+
+class RequestDBStats:
+    """Mongo commands issued while handling one request"""
+
+    def __init__(self, request_id: str, method: str, path: str):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.commands: Counter[tuple[str, str]] = Counter()
+        self.duration = 0.0
+
+    @property
+    def count(self) -> int:
+        # getMore fetches the next batch of a cursor already counted, a
+        # streamed export issues one per EXPORT_BATCH_SIZE documents
+        return sum(
+            count for (name, _), count in self.commands.items() if name != "getMore"
+        )
+
+    def summary(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "commands": self.count,
+            "db_time": round(self.duration * 1000, 3),
+            # e.g. {"find houses": 51} points at per item lookups
+            "by_command": {
+                f"{name} {collection}": count
+                for (name, collection), count in self.commands.most_common()
+            },
+        }
+
+
+request_db_stats: contextvars.ContextVar[RequestDBStats | None] = (
+    contextvars.ContextVar("request_db_stats", default=None)
+)
+
+
+def filter_shape(value: Any) -> Any:
+    """Query filter with its values replaced by their type names
+
+    `{"name": {"$regex": "^ab"}}` -> `{"name": {"$regex": "str"}}`, so slow
+    queries can be grouped without logging user data."""
+    if isinstance(value, dict):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            return [filter_shape(item) for item in value]
+        return "array"
+    return type(value).__name__
+
+
+def command_filter(command_name: str, command: dict) -> Any:
+    if command_name == "find":
+        return command.get("filter")
+    if command_name in ("count", "findAndModify", "distinct"):
+        return command.get("query")
+    if command_name == "update":
+        return [update.get("q") for update in command.get("updates", [])[:1]]
+    if command_name == "delete":
+        return [delete.get("q") for delete in command.get("deletes", [])[:1]]
+    if command_name == "aggregate":
+        return command.get("pipeline", [])[:1]
+    return None
+
+
+def command_collection(command_name: str, command: dict) -> str:
+    if command_name == "getMore":
+        return command.get("collection", "")
+    collection = command.get(command_name)
+    return collection if isinstance(collection, str) else ""
+
+
+class CommandMonitoringListener(monitoring.CommandListener):
+    """Logs every Mongo command with its request id and counts it per request
+
+    Commands slower than `slow_query_ms` are logged as warnings with the shape
+    of their filter. Listener callbacks run on the thread issuing the command,
+    so the request context is visible from the started/succeeded events."""
+
+    def __init__(self, slow_query_ms: float):
+        self.slow_query_ms = slow_query_ms
+        # started events carry the command, finished events only its ids
+        self._started: dict[tuple, tuple[str, Any]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        self._started[(event.connection_id, event.request_id)] = (
+            command_collection(event.command_name, event.command),
+            command_filter(event.command_name, event.command),
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finished(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finished(event, failed=True)
+
+    def _finished(self, event, failed: bool) -> None:
+        collection, query = self._started.pop(
+            (event.connection_id, event.request_id), ("", None)
+        )
+        duration_ms = event.duration_micros / 1000
+        stats = request_db_stats.get()
+        request_id = stats.request_id if stats is not None else None
+        if stats is not None:
+            stats.commands[(event.command_name, collection)] += 1
+            stats.duration += event.duration_micros / 1_000_000
+
+        logger.opt(lazy=True).debug(
+            "mongo {} {} {}ms request_id={}",
+            lambda: event.command_name,
+            lambda: collection,
+            lambda: f"{duration_ms:.3f}",
+            lambda: request_id,
+        )
+        if failed or duration_ms >= self.slow_query_ms:
+            logger.warning(
+                {
+                    "detail": "Failed mongo command" if failed else "Slow mongo query",
+                    "command": event.command_name,
+                    "collection": collection,
+                    "filter": filter_shape(query) if query is not None else None,
+                    "duration_ms": round(duration_ms, 3),
+                    "request_id": request_id,
+                }
+            )
+
+
+class PoolMonitoringListener(monitoring.ConnectionPoolListener):
+    """Connection pool usage of one client: open and checked-out connections,
+    waiters, wait time
+
+    Reported as Prometheus metrics labelled by `client` and through `stats()`.
+    A checkout is started and completed on the same thread, which times it. It
+    counts as a waiter when no idle connection was left as it started, so it
+    waits for a new connection or for another operation to check one in."""
+
+    def __init__(self, client: str):
+        self.client = client
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.connections = 0
+        self.checked_out = 0
+        self.waiters = 0
+        # checkouts in progress that found an idle connection
+        self.claimed = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.pool_clears = 0
+
+    def _change(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def _end_checkout(self, checked_out: bool) -> float:
+        started_at, waiting = getattr(self._local, "checkout", (None, False))
+        self._local.checkout = (None, False)
+        if started_at is None:
+            return 0.0
+
+        wait_time = time.perf_counter() - started_at
+        with self._lock:
+            if waiting:
+                self.waiters -= 1
+            else:
+                self.claimed -= 1
+            if checked_out:
+                self.checked_out += 1
+                self.checkouts += 1
+                self.total_wait_time += wait_time
+                self.max_wait_time = max(self.max_wait_time, wait_time)
+            else:
+                self.checkout_failures += 1
+        if waiting:
+            DB_POOL_WAITERS.labels(self.client).dec()
+        return wait_time
+
+    def connection_check_out_started(self, event) -> None:
+        with self._lock:
+            waiting = self.connections - self.checked_out - self.claimed <= 0
+            if waiting:
+                self.waiters += 1
+            else:
+                self.claimed += 1
+        self._local.checkout = (time.perf_counter(), waiting)
+        if waiting:
+            DB_POOL_WAITERS.labels(self.client).inc()
+
+    def connection_checked_out(self, event) -> None:
+        wait_time = self._end_checkout(checked_out=True)
+        DB_POOL_CHECKED_OUT.labels(self.client).inc()
+        DB_POOL_WAIT.labels(self.client).observe(wait_time)
+
+    def connection_check_out_failed(self, event) -> None:
+        self._end_checkout(checked_out=False)
+
+    def connection_checked_in(self, event) -> None:
+        self._change(checked_out=-1)
+        DB_POOL_CHECKED_OUT.labels(self.client).dec()
+
+    def connection_created(self, event) -> None:
+        self._change(connections=1)
+        DB_POOL_CONNECTIONS.labels(self.client).inc()
+
+    def connection_closed(self, event) -> None:
+        self._change(connections=-1)
+        DB_POOL_CONNECTIONS.labels(self.client).dec()
+
+    def pool_cleared(self, event) -> None:
+        self._change(pool_clears=1)
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "client": self.client,
+                "connections": self.connections,
+                "checked_out": self.checked_out,
+                "waiters": self.waiters,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_wait_time": (
+                    self.total_wait_time / self.checkouts if self.checkouts else 0.0
+                ),
+                "max_wait_time": self.max_wait_time,
+                "pool_clears": self.pool_clears,
+            }
+
+
+# one listener per client, their pools are separate
+pool_monitors = {
+    client: PoolMonitoringListener(client) for client in ("mongoengine", "motor")
+}
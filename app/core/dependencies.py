@@ -1,25 +1,22 @@
-from fastapi import Depends
-from jose import jwt
+from fastapi import Depends, Request
 from pydantic import ValidationError
 
-from app.core.config import settings
 from app.core.exceptions import AuthError
-from app.core.security import ALGORITHM, JWTBearer
+from app.core.security import JWTBearer
 from app.models.user_model import User
 from app.schemas.auth_schema import Payload
-from app.services.user_service import UserService
 
 
 def get_current_user(
+    request: Request,
     token: str = Depends(JWTBearer()),
 ) -> User:
-    service = UserService()
+    # JWTBearer already decoded and verified the token for this request
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=ALGORITHM)
-        token_data = Payload(**payload)
-    except (jwt.JWTError, ValidationError):
+        Payload(**request.state.token_payload)
+    except ValidationError:
         raise AuthError(detail="Could not validate credentials")
-    current_user: User = service.get_by_id(token_data.id)
+    current_user: User = request.state.current_user
     if not current_user:
         raise AuthError(detail="User not found")
     return current_user
@@ -32,15 +29,14 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
 
 
 def get_current_user_with_no_exception(
+    request: Request,
     token: str = Depends(JWTBearer()),
-    service: UserService = Depends(UserService),
 ) -> User:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=ALGORITHM)
-        token_data = Payload(**payload)
-    except (jwt.JWTError, ValidationError):
+        Payload(**request.state.token_payload)
+    except (AttributeError, ValidationError):
         return None
-    current_user: User = service.get_by_id(token_data.id)
+    current_user: User = getattr(request.state, "current_user", None)
     if not current_user:
         return None
     return current_user
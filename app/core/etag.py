@@ -0,0 +1,35 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag, the body may be re-encoded (e.g. compressed) on the way out
+
+    `bytes` parts (e.g. a rendered body) are hashed as they are."""
+    digest = hashlib.blake2b(
+        b"|".join(
+            part if isinstance(part, bytes) else str(part).encode() for part in parts
+        ),
+        digest_size=16,
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    # weak comparison, see RFC 9110 section 13.1.2
+    return etag.removeprefix("W/") in {
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    }
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
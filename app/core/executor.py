@@ -0,0 +1,212 @@
+import asyncio
+import contextvars
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.metrics import (
+    EXECUTOR_QUEUED,
+    EXECUTOR_REJECTED,
+    EXECUTOR_RUNNING,
+    EXECUTOR_WAIT,
+)
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """Size-limited thread pool that keeps queue depth and wait time stats.
+
+    The stats are exported as Prometheus metrics labelled by `name`.
+
+    Calls are run inside a copy of the caller context so context variables
+    (e.g. `fastapi_pagination` params) are visible from the worker thread."""
+
+    def __init__(self, max_workers: int, name: str):
+        self.max_workers = max_workers
+        self.name = name
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix=self.name
+                    )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        context = contextvars.copy_context()
+        submitted_at = time.perf_counter()
+
+        def call() -> T:
+            wait_time = time.perf_counter() - submitted_at
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.total_wait_time += wait_time
+                self.max_wait_time = max(self.max_wait_time, wait_time)
+            EXECUTOR_QUEUED.labels(self.name).dec()
+            EXECUTOR_RUNNING.labels(self.name).inc()
+            EXECUTOR_WAIT.labels(self.name).observe(wait_time)
+            try:
+                return context.run(func, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                EXECUTOR_RUNNING.labels(self.name).dec()
+
+        def on_done(future: Future) -> None:
+            if future.cancelled():
+                with self._lock:
+                    self.queued -= 1
+                EXECUTOR_QUEUED.labels(self.name).dec()
+
+        with self._lock:
+            self.queued += 1
+        EXECUTOR_QUEUED.labels(self.name).inc()
+        future = self.executor.submit(call)
+        future.add_done_callback(on_done)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self.running + self.completed
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "avg_wait_time": self.total_wait_time / started if started else 0.0,
+                "max_wait_time": self.max_wait_time,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+            logger.info(f"Shut down {self.name} executor {self.stats()}")
+
+
+process_pools: list["BoundedProcessPool"] = []
+
+
+def _timed_call(func: Callable[..., T], *args: Any) -> tuple[T, float]:
+    # CLOCK_MONOTONIC is shared by every process of the host
+    started_at = time.monotonic()
+    return func(*args), started_at
+
+
+class BoundedProcessPool:
+    """Process pool for CPU bound work with a bounded queue and wait time stats
+
+    `func` must be a module level function so it can be pickled. Calls beyond
+    `max_workers + max_queue` pending ones are rejected with a 503. Calls
+    beyond `max_workers` pending ones are reported as queued, the workers pick
+    them up in submission order."""
+
+    def __init__(self, max_workers: int, max_queue: int, name: str):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.name = name
+        self._executor: ProcessPoolExecutor | None = None
+        self.pending = 0
+        self.rejected = 0
+        self.completed = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        process_pools.append(self)
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, forking a process with a running loop and driver threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            EXECUTOR_REJECTED.labels(self.name).inc()
+            raise ServiceUnavailableError(detail=f"{self.name} pool is busy")
+
+        loop = asyncio.get_running_loop()
+        submitted_at = time.monotonic()
+        self._set_pending(self.pending + 1)
+        try:
+            result, started_at = await loop.run_in_executor(
+                self.executor, _timed_call, func, *args
+            )
+        finally:
+            self._set_pending(self.pending - 1)
+
+        wait_time = max(started_at - submitted_at, 0.0)
+        self.completed += 1
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+        EXECUTOR_WAIT.labels(self.name).observe(wait_time)
+        return result
+
+    def _set_pending(self, pending: int) -> None:
+        self.pending = pending
+        EXECUTOR_QUEUED.labels(self.name).set(max(pending - self.max_workers, 0))
+        EXECUTOR_RUNNING.labels(self.name).set(min(pending, self.max_workers))
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "avg_wait_time": (
+                self.total_wait_time / self.completed if self.completed else 0.0
+            ),
+            "max_wait_time": self.max_wait_time,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+            logger.info(f"Shut down {self.name} process pool {self.stats()}")
+
+
+db_executor = BoundedExecutor(
+    max_workers=settings.DB_THREAD_POOL_SIZE or settings.DB_MAX_POOL_SIZE,
+    name="db",
+)
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a synchronous service/repository call according to `DB_EXECUTION_MODE`.
+
+    - ``inline``: call directly on the event loop (blocking)
+    - ``threadpool``: run on the bounded `db_executor`"""
+    if settings.DB_EXECUTION_MODE == "threadpool":
+        return await db_executor.run(func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
+def shutdown_executors() -> None:
+    db_executor.shutdown()
+    for pool in process_pools:
+        pool.shutdown()
@@ -0,0 +1,84 @@
+import csv
+import io
+from typing import AsyncIterator, Literal
+
+from mongoengine import QuerySet
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+from app.core.executor import run_db
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _csv_header(schema: type[BaseModel]) -> list[str]:
+    return [
+        field.serialization_alias or field.alias or name
+        for name, field in schema.model_fields.items()
+    ]
+
+
+def _encode_batch(
+    cursor: QuerySet, schema: type[BaseModel], format: ExportFormat, size: int
+) -> bytes:
+    """Pull up to `size` raw documents from the cursor and encode them"""
+    rows = []
+    # next(), iterating a no_cache QuerySet again would rewind the cursor
+    for son in iter(lambda: next(cursor, None), None):
+        rows.append(schema.model_validate(son))
+        if len(rows) >= size:
+            break
+
+    if format == "ndjson":
+        return b"".join(
+            row.model_dump_json(by_alias=True).encode() + b"\n" for row in rows
+        )
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=_csv_header(schema))
+    writer.writerows(row.model_dump(mode="json", by_alias=True) for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def _export_rows(
+    request: Request,
+    queryset: QuerySet,
+    schema: type[BaseModel],
+    format: ExportFormat,
+    batch_size: int,
+) -> AsyncIterator[bytes]:
+    # no_cache: iterating a regular QuerySet keeps every document in memory
+    cursor = queryset.no_cache().as_pymongo().batch_size(batch_size)
+    if format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(_csv_header(schema))
+        yield buffer.getvalue().encode()
+
+    while not await request.is_disconnected():
+        chunk = await run_db(_encode_batch, cursor, schema, format, batch_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def export_response(
+    request: Request,
+    queryset: QuerySet,
+    schema: type[BaseModel],
+    format: ExportFormat,
+    batch_size: int,
+    filename: str,
+) -> StreamingResponse:
+    """Stream every document of `queryset` as NDJSON or CSV rows of `schema`
+
+    Documents are read from a server-side cursor and encoded one batch at a
+    time, so memory does not grow with the number of rows. The stream stops
+    when the client disconnects, compression is left to `CompressionMiddleware`."""
+    return StreamingResponse(
+        _export_rows(request, queryset, schema, format, batch_size),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
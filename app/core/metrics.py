@@ -0,0 +1,205 @@
+import asyncio
+import functools
+import os
+import time
+from typing import Any, Callable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# with several workers every process writes its samples to
+# PROMETHEUS_MULTIPROC_DIR and /metrics aggregates them, the directory must be
+# set before the workers start and emptied between runs
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being processed",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_DURATION = Histogram(
+    "db_operation_duration_seconds",
+    "Repository call latency by model and method",
+    ["model", "method"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_ERRORS = Counter(
+    "db_operation_errors_total",
+    "Repository calls that raised by model and method",
+    ["model", "method"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Mongo connections checked out of the pool by client",
+    ["client"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAITERS = Gauge(
+    "db_pool_waiters",
+    "Operations waiting for a Mongo connection, none was idle, by client",
+    ["client"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Open Mongo connections by client",
+    ["client"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent checking a Mongo connection out by client",
+    ["client"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+EXECUTOR_QUEUED = Gauge(
+    "executor_queued_calls",
+    "Calls waiting for a free worker by executor",
+    ["executor"],
+    multiprocess_mode="livesum",
+)
+EXECUTOR_RUNNING = Gauge(
+    "executor_running_calls",
+    "Calls running on an executor worker by executor",
+    ["executor"],
+    multiprocess_mode="livesum",
+)
+EXECUTOR_WAIT = Histogram(
+    "executor_wait_seconds",
+    "Time calls spent queued before a worker picked them up by executor",
+    ["executor"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+EXECUTOR_REJECTED = Counter(
+    "executor_rejected_calls_total",
+    "Calls rejected because the executor queue was full by executor",
+    ["executor"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss)",
+    ["cache", "result"],
+)
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the matched route, e.g. `/api/v1/house/{house_id}`
+
+    Unmatched requests share one label so raw paths never become labels."""
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Records request count, latency and in-flight requests per route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start_time = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            route = route_template(scope)
+            REQUEST_DURATION.labels(method, route).observe(
+                time.perf_counter() - start_time
+            )
+            REQUESTS.labels(method, route, str(status_code)).inc()
+
+
+def observe_db(func: Callable) -> Callable:
+    """Repository method decorator recording its latency by model and method
+
+    A private `_get_by_id` fetch helper is labelled like its public method."""
+
+    def labels(self) -> tuple[str, str]:
+        return self.model.__name__, func.__name__.lstrip("_")
+
+    if asyncio.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            start_time = time.perf_counter()
+            try:
+                return await func(self, *args, **kwargs)
+            except Exception:
+                DB_ERRORS.labels(*labels(self)).inc()
+                raise
+            finally:
+                DB_DURATION.labels(*labels(self)).observe(
+                    time.perf_counter() - start_time
+                )
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        start_time = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        except Exception:
+            DB_ERRORS.labels(*labels(self)).inc()
+            raise
+        finally:
+            DB_DURATION.labels(*labels(self)).observe(time.perf_counter() - start_time)
+
+    return wrapper
+
+
+def observe_cache(name: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(name, "hit" if hit else "miss").inc()
+
+
+def metrics(request: Request) -> Response:
+    """Prometheus exposition of this process, or of every worker in multiprocess"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        data = generate_latest(registry)
+    else:
+        data = generate_latest()
+    return Response(data, media_type=CONTENT_TYPE_LATEST)
+
+
+def shutdown_metrics() -> None:
+    # drops the live gauges of this worker from the aggregated view
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,159 @@
+import random
+import re
+import time
+import uuid
+
+from fastapi import status
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.db_monitoring import RequestDBStats, request_db_stats
+from app.core.timing import ServerTiming, server_timing
+
+
+def compile_agents(agents: list[str]) -> re.Pattern[bytes] | None:
+    """One case-insensitive pattern matching any of `agents` in raw header bytes"""
+    if not agents:
+        return None
+    return re.compile(
+        b"|".join(re.escape(agent.lower().encode("latin-1")) for agent in agents),
+        re.IGNORECASE,
+    )
+
+
+class ProcessTimeMiddleware:
+    """Rejects disallowed user agents and adds the `X-Process-Time` header
+
+    Plain ASGI middleware, so responses (including streaming ones) are passed
+    through without an extra task or buffering."""
+
+    def __init__(self, app: ASGIApp, disallow_agents: list[str]):
+        self.app = app
+        self.disallow_agents = compile_agents(disallow_agents)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        user_agent = b""
+        for name, value in scope["headers"]:
+            if name == b"user-agent":
+                user_agent = value
+                break
+
+        # lazy: nothing is formatted unless debug logging is enabled
+        logger.opt(lazy=True).debug(
+            "user-agent ==> {}", lambda: user_agent.decode("latin-1")
+        )
+        if self.disallow_agents is not None and self.disallow_agents.search(user_agent):
+            logger.warning({"detail": "Client is not allow to uses."})
+            response = JSONResponse(
+                status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                content={"detail": "Client is not allow to uses."},
+            )
+            await response(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+
+        async def send_with_process_time(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "X-Process-Time", f"{time.perf_counter() - start_time:0.6f}"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_process_time)
+
+
+class ServerTimingMiddleware:
+    """Collects per-layer spans (see `app.core.timing`) into `Server-Timing`
+
+    Time between the route handler returning and the response start reaching
+    this middleware (response rendering, compression) is the `compress` span.
+    A `log_sample_rate` share of requests is also logged as one structured line."""
+
+    def __init__(self, app: ASGIApp, log_sample_rate: float = 0.0):
+        self.app = app
+        self.log_sample_rate = log_sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = ServerTiming()
+        token = server_timing.set(timing)
+        status_code = None
+
+        async def send_with_server_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if timing.handler_ended_at is not None:
+                    elapsed = time.perf_counter() - timing.handler_ended_at
+                    timing.add("compress", elapsed)
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timing.header())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            server_timing.reset(token)
+            if self.log_sample_rate and random.random() < self.log_sample_rate:
+                total = time.perf_counter() - timing.started_at
+                logger.info(
+                    {
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "total": round(total * 1000, 3),
+                        "spans": timing.as_dict(),
+                    }
+                )
+
+
+class DBMonitoringMiddleware:
+    """Tags the request with an id and warns when it issues too many DB commands
+
+    The id is taken from the `X-Request-ID` header (or generated) and echoed
+    back, every Mongo command logged while handling the request carries it."""
+
+    def __init__(self, app: ASGIApp, max_commands: int):
+        self.app = app
+        self.max_commands = max_commands
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        stats = RequestDBStats(request_id, scope["method"], scope["path"])
+        token = request_db_stats.set(stats)
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Request-ID", request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_db_stats.reset(token)
+            if self.max_commands and stats.count > self.max_commands:
+                logger.warning(
+                    {"detail": "Too many mongo commands", **stats.summary()}
+                )
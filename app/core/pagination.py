@@ -1,8 +1,24 @@
+import base64
+import binascii
+from typing import Any, Generic, Literal, Sequence, TypeVar
+
+from bson import json_util
 from fastapi import Query
+from mongoengine import Q, QuerySet
+from pydantic import BaseModel
 
 from fastapi_pagination import default
+from fastapi_pagination.api import apply_items_transformer, create_page
+from fastapi_pagination.bases import AbstractParams, RawParams
+from fastapi_pagination.ext.mongoengine import paginate as paginate_documents
+from fastapi_pagination.types import SyncItemsTransformer
+from fastapi_pagination.utils import verify_params
 
 from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.core.timing import timed
+
+T = TypeVar("T")
 
 Page = default.Page.with_custom_options(
     size=Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
@@ -10,3 +26,167 @@ Page = default.Page.with_custom_options(
 """If doesn't need a custom pagination
 
 Just use `Page` from `from fastapi_pagination import Page` instead."""
+
+
+paginate = timed("paginate")(paginate_documents)
+"""`fastapi_pagination.ext.mongoengine.paginate` timed as the `paginate` span"""
+
+
+@timed("paginate")
+def paginate_raw(
+    queryset: QuerySet,
+    params: AbstractParams | None = None,
+    *,
+    transformer: SyncItemsTransformer | None = None,
+) -> Any:
+    """Limit-offset pagination yielding raw BSON dicts
+
+    Same contract as `fastapi_pagination.ext.mongoengine.paginate` without
+    building (and then dumping) a `Document` per row."""
+    params, raw_params = verify_params(params, "limit-offset")
+
+    total = queryset.count() if raw_params.include_total else None
+    cursor = queryset.as_pymongo().skip(raw_params.offset).limit(raw_params.limit)
+    items = apply_items_transformer(list(cursor), transformer)
+
+    return create_page(items, total=total, params=params)
+
+
+def fingerprint(total: int | None, raw_params: RawParams, rows: list[dict]) -> list:
+    """Total, bounds, ids and max `updated_date` of a limit-offset page of BSON
+    dicts, the parts of a list ETag"""
+    updated_date = max(
+        (row["updated_date"] for row in rows if row.get("updated_date")), default=None
+    )
+    return [
+        total,
+        raw_params.offset,
+        raw_params.limit,
+        updated_date,
+        *(row["_id"] for row in rows),
+    ]
+
+
+@timed("paginate")
+def page_fingerprint(
+    queryset: QuerySet, params: AbstractParams | None = None
+) -> list[Any]:
+    """`fingerprint` of the current page loading only `_id`/`updated_date`
+
+    Cheap enough to answer `If-None-Match` before the page itself is fetched."""
+    params, raw_params = verify_params(params, "limit-offset")
+
+    fields = [f for f in ("id", "updated_date") if f in queryset._document._fields]
+    total = queryset.count() if raw_params.include_total else None
+    rows = list(
+        queryset.all_fields()
+        .only(*fields)
+        .as_pymongo()
+        .skip(raw_params.offset)
+        .limit(raw_params.limit)
+    )
+    return fingerprint(total, raw_params, rows)
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: Sequence[T]
+    size: int
+    next_page: str | None = None
+    previous_page: str | None = None
+
+
+class CursorParams:
+    def __init__(
+        self,
+        cursor: str | None = Query(None, description="Opaque next/previous cursor"),
+        size: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    ):
+        self.cursor = cursor
+        self.size = size
+
+
+def encode_cursor(direction: Literal["next", "prev"], values: list[Any]) -> str:
+    raw = json_util.dumps({"d": direction, "v": values})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, list[Any]]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json_util.loads(raw)
+        direction, values = data["d"], data["v"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValidationError(detail="Invalid cursor")
+
+    if direction not in ("next", "prev") or not isinstance(values, list):
+        raise ValidationError(detail="Invalid cursor")
+
+    return direction, values
+
+
+def _keyset_query(ordering: Sequence[str], values: list[Any], operator: str) -> Q:
+    """Build `(a, b) > (x, y)` as `a > x or (a == x and b > y)`"""
+    query = Q()
+    for i, field in enumerate(ordering):
+        condition = Q(
+            **{f: v for f, v in zip(ordering[:i], values[:i])},
+            **{f"{field}__{operator}": values[i]},
+        )
+        query = query | condition if i else condition
+    return query
+
+
+@timed("paginate")
+def paginate_by_cursor(
+    queryset: QuerySet,
+    params: CursorParams,
+    ordering: Sequence[str] = ("created_date", "id"),
+) -> dict:
+    """Keyset pagination over `ordering`, the last field must be unique.
+
+    Each page is one indexed range query of `size + 1` documents, so the cost
+    does not depend on how deep the page is."""
+    direction, values = "next", None
+    if params.cursor:
+        direction, values = decode_cursor(params.cursor)
+        if len(values) != len(ordering):
+            raise ValidationError(detail="Invalid cursor")
+
+    if direction == "next":
+        operator, sort = "gt", [f"+{field}" for field in ordering]
+    else:
+        operator, sort = "lt", [f"-{field}" for field in ordering]
+
+    if queryset._loaded_fields:
+        # keep the keyset values loaded when a projection is applied
+        queryset = queryset.only(*ordering)
+
+    if values is not None:
+        queryset = queryset.filter(_keyset_query(ordering, values, operator))
+
+    items = list(queryset.order_by(*sort).limit(params.size + 1))
+    has_more = len(items) > params.size
+    items = items[: params.size]
+    if direction == "prev":
+        items.reverse()
+
+    db_fields = [queryset._document._db_field_map.get(f, f) for f in ordering]
+
+    def cursor_of(item, cursor_direction) -> str:
+        if isinstance(item, dict):
+            return encode_cursor(cursor_direction, [item[f] for f in db_fields])
+        return encode_cursor(cursor_direction, [getattr(item, f) for f in ordering])
+
+    next_page = previous_page = None
+    if items:
+        if has_more or direction == "prev":
+            next_page = cursor_of(items[-1], "next")
+        if values is not None and (has_more or direction == "next"):
+            previous_page = cursor_of(items[0], "prev")
+
+    return {
+        "items": items,
+        "size": params.size,
+        "next_page": next_page,
+        "previous_page": previous_page,
+    }
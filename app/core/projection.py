@@ -0,0 +1,64 @@
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import Query, Request
+from pydantic import BaseModel, create_model
+
+from app.core.exceptions import ValidationError
+
+
+def get_item_schema(schema: type[BaseModel]) -> type[BaseModel]:
+    """Unwrap generic pages such as `Page[ResponseHouse]` to `ResponseHouse`"""
+    args = getattr(schema, "__pydantic_generic_metadata__", {}).get("args", ())
+    if args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+        return get_item_schema(args[0])
+    return schema
+
+
+@lru_cache
+def sparse_model(schema: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    return create_model(
+        f"{schema.__name__}Sparse",
+        __config__=schema.model_config,
+        **{
+            name: (schema.model_fields[name].annotation, schema.model_fields[name])
+            for name in fields
+        },
+    )
+
+
+class Projection:
+    """Fields to load for the route response model, narrowed by `?fields=`
+
+    Schema field names are expected to mirror the document field names, which
+    is how `BaseSchemaInfo` and the model schemas are written."""
+
+    def __init__(
+        self,
+        request: Request,
+        fields: Optional[str] = Query(
+            None, description="Comma separated fields to return, e.g. name,volume"
+        ),
+    ):
+        self.schema = get_item_schema(request.scope["route"].response_model)
+        requested = [f.strip() for f in (fields or "").split(",") if f.strip()]
+        unknown = set(requested) - set(self.schema.model_fields)
+        if unknown:
+            raise ValidationError(
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+
+        self.is_sparse = bool(requested)
+        if "id" in self.schema.model_fields and "id" not in requested:
+            requested.insert(0, "id")
+        self.fields = (
+            [name for name in self.schema.model_fields if name in requested]
+            if self.is_sparse
+            else list(self.schema.model_fields)
+        )
+
+    @property
+    def model(self) -> type[BaseModel]:
+        if not self.is_sparse:
+            return self.schema
+        return sparse_model(self.schema, tuple(self.fields))
@@ -0,0 +1,156 @@
+import hashlib
+import threading
+from typing import Any, Protocol
+
+import orjson
+from fastapi import Request, Response
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+from app.core.etag import is_not_modified, not_modified
+from app.core.metrics import observe_cache
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+
+class QueryCacheBackend(Protocol):
+    def get(self, key: str) -> bytes | None:
+        ...
+
+    def set(self, key: str, value: bytes) -> None:
+        ...
+
+    def get_version(self, collection: str) -> int:
+        ...
+
+    def bump_version(self, collection: str) -> None:
+        ...
+
+
+class MemoryBackend:
+    """Per process backend, a write only bumps the version of its own worker
+
+    Other workers keep serving their entries until `ttl` expires them."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl, name="query")
+        self.versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        value = self.entries.get(key)
+        return None if value is MISSING else value
+
+    def set(self, key: str, value: bytes) -> None:
+        self.entries.set(key, value)
+
+    def get_version(self, collection: str) -> int:
+        return self.versions.get(collection, 0)
+
+    def bump_version(self, collection: str) -> None:
+        with self._lock:
+            self.versions[collection] = self.versions.get(collection, 0) + 1
+
+
+class RedisBackend:
+    """Shared backend, versions and entries are visible to every worker
+
+    `client` needs the `get`/`set`/`incr` methods of `redis.Redis`, so a local
+    stand-in such as `fakeredis.FakeRedis()` can be passed in tests. Entries
+    expire after `ttl`, memory is bounded by that and the server maxmemory."""
+
+    def __init__(self, client: Any, ttl: float, prefix: str = "query-cache:"):
+        self.client = client
+        self.ttl_ms = int(ttl * 1000)
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, ttl: float) -> "RedisBackend":
+        if redis is None:
+            raise RuntimeError("QUERY_CACHE_BACKEND=redis needs the redis package")
+        return cls(redis.Redis.from_url(url), ttl)
+
+    def get(self, key: str) -> bytes | None:
+        value = self.client.get(self.prefix + key)
+        observe_cache("query", hit=value is not None)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(self.prefix + key, value, px=self.ttl_ms)
+
+    def get_version(self, collection: str) -> int:
+        return int(self.client.get(f"{self.prefix}version:{collection}") or 0)
+
+    def bump_version(self, collection: str) -> None:
+        self.client.incr(f"{self.prefix}version:{collection}")
+
+
+class QueryCache:
+    """Rendered list responses keyed by route, collection version and params
+
+    Writes bump the collection version (see `BaseRepository`), which moves
+    every later lookup to new keys, so stale entries are never read again and
+    age out of the backend."""
+
+    def __init__(self, backend: QueryCacheBackend):
+        self.backend = backend
+
+    def key(self, route: str, collection: str, params: Any) -> str:
+        digest = hashlib.blake2b(
+            orjson.dumps(params, option=orjson.OPT_SORT_KEYS), digest_size=16
+        ).hexdigest()
+        version = self.backend.get_version(collection)
+        return f"{route}:{collection}:{version}:{digest}"
+
+    def get(self, key: str) -> tuple[str, bytes] | None:
+        value = self.backend.get(key)
+        if value is None:
+            return None
+        etag, _, body = value.partition(b"\n")
+        return etag.decode(), body
+
+    def set(self, key: str, etag: str, body: bytes) -> None:
+        self.backend.set(key, etag.encode() + b"\n" + body)
+
+    def bump(self, collection: str) -> None:
+        self.backend.bump_version(collection)
+
+    def response(self, request: Request, key: str) -> Response | None:
+        """Cached response for `key` (or a 304 for its ETag), None on a miss"""
+        cached = self.get(key)
+        if cached is None:
+            return None
+
+        etag, body = cached
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
+_query_cache: QueryCache | None = None
+_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache | None:
+    """Process wide query cache from `QUERY_CACHE_*` settings, None when off"""
+    global _query_cache
+    if settings.QUERY_CACHE_BACKEND == "off":
+        return None
+
+    if _query_cache is None:
+        with _lock:
+            if _query_cache is None:
+                backend = (
+                    RedisBackend.from_url(
+                        settings.QUERY_CACHE_REDIS_URL, settings.QUERY_CACHE_TTL
+                    )
+                    if settings.QUERY_CACHE_BACKEND == "redis"
+                    else MemoryBackend(
+                        settings.QUERY_CACHE_SIZE, settings.QUERY_CACHE_TTL
+                    )
+                )
+                _query_cache = QueryCache(backend)
+    return _query_cache
@@ -0,0 +1,39 @@
+import datetime
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        return value.strftime(settings.DATETIME_FORMAT)
+    if isinstance(value, datetime.date):
+        return value.strftime(settings.DATE_FORMAT)
+    if isinstance(value, datetime.time):
+        return value.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered straight to bytes
+
+    Pydantic models are serialized by pydantic-core in one pass (by alias, as
+    the routes do), anything else goes through orjson with `ObjectId` as str
+    and datetimes formatted with `DATETIME_FORMAT`/`DATE_FORMAT`.
+
+    Routes that already hold a validated model can return
+    `FastJSONResponse(model)` to also skip the `response_model` validation."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content, by_alias=True)
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
@@ -1,4 +1,6 @@
 import datetime
+import hashlib
+import time
 import pyotp
 
 from fastapi import Request
@@ -6,11 +8,25 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt
 from passlib.context import CryptContext
 
+from app.core.cache import MISSING, get_cache
 from app.core.config import settings
 from app.core.exceptions import AuthError
+from app.core.executor import BoundedProcessPool, run_db
 from app.repository.user_repository import UserRepository
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    # hashes with another cost are flagged by verify_and_update_password
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
+password_pool = BoundedProcessPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+    name="password",
+)
 ALGORITHM = "HS256"
 
 OTP = pyotp.HOTP(
@@ -20,6 +36,39 @@ OTP = pyotp.HOTP(
     # interval=settings.OTP_INTERVAL,
 )
 
+# token hash -> (payload, user son, monotonic time the verification started)
+token_cache = get_cache(
+    "auth.tokens", maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL
+)
+# user id -> monotonic time its tokens were last reissued or revoked, entries
+# older than TOKEN_CACHE_TTL are pruned as no cached verification outlives them
+user_revoked_at: dict[str, float] = {}
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def invalidate_user_tokens(user_id: str) -> None:
+    """Drop cached verifications of every token of `user_id` (this process)
+
+    Call it after the new token expiry is stored, a verification that read
+    the old one started before and is not served from the cache again."""
+    now = time.monotonic()
+    for key, revoked_at in list(user_revoked_at.items()):
+        if revoked_at < now - settings.TOKEN_CACHE_TTL:
+            user_revoked_at.pop(key, None)
+
+    if len(user_revoked_at) >= settings.TOKEN_CACHE_SIZE:
+        # too many recent revocations to track, forget every verification
+        token_cache.clear()
+        user_revoked_at.clear()
+    user_revoked_at[str(user_id)] = now
+
+
+def revoke_token(token: str) -> None:
+    token_cache.pop(token_key(token))
+
 
 def create_access_token(
     subject: dict, expires_delta: datetime.timedelta = None
@@ -53,31 +102,87 @@ def create_refresh_token(
     return encoded_jwt, expire
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
+def _verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def decode_jwt(token: str) -> dict:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(_verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify and return a new hash when `pwd_context` parameters changed
+
+    The caller stores the new hash, e.g. after raising PASSWORD_BCRYPT_ROUNDS."""
+    return await password_pool.run(
+        _verify_and_update_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash(password: str) -> str:
+    return await password_pool.run(_get_password_hash, password)
+
+
+def authenticate_token(token: str) -> tuple[dict, object] | None:
+    """Verified payload and user of `token`
+
+    The stored token expiry is checked on every call unless
+    `TOKEN_CACHE_ENABLED` is set. A cache hit then skips the JWT decode and
+    the user/token lookups until the entry expires, the token expires or the
+    user's tokens are reissued on this process (see `invalidate_user_tokens`)."""
+    key = token_key(token)
+    user_repository = UserRepository()
+    started_at = time.monotonic()
+    if settings.TOKEN_CACHE_ENABLED:
+        cached = token_cache.get(key)
+        if cached is not MISSING:
+            payload, user, verified_at = cached
+            if (
+                payload["exp"] > time.time()
+                and verified_at > started_at - settings.TOKEN_CACHE_TTL
+                and verified_at > user_revoked_at.get(str(payload["id"]), 0.0)
+            ):
+                return payload, user_repository.model._from_son(user)
+            token_cache.pop(key)
+
     try:
-        user_repository = UserRepository()
-        decoded_token = jwt.decode(token, settings.SECRET_KEY, algorithms=ALGORITHM)
-        user = user_repository.get_by_id(decoded_token["id"])
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=ALGORITHM)
+        user = user_repository.get_by_id(payload["id"])
         user_token = user_repository.get_token(user)
-
-        return (
-            decoded_token
-            if decoded_token["exp"] == user_token.access_token_expires.timestamp()
-            else None
-        )
     except Exception as e:
-        return {}
+        return None
+
+    if payload["exp"] != user_token.access_token_expires.timestamp():
+        return None
+
+    if settings.TOKEN_CACHE_ENABLED:
+        token_cache.set(key, (payload, user.to_mongo(), started_at))
+    return payload, user
+
+
+def decode_jwt(token: str) -> dict:
+    authenticated = authenticate_token(token)
+    return authenticated[0] if authenticated else {}
 
 
 class JWTBearer(HTTPBearer):
+    """Verifies the bearer token once per request
+
+    The payload and user are kept on `request.state.token_payload` and
+    `request.state.current_user` for the dependencies in `app.core.dependencies`."""
+
     def __init__(self, auto_error: bool = True):
         super(JWTBearer, self).__init__(auto_error=auto_error)
 
@@ -89,19 +194,18 @@ class JWTBearer(HTTPBearer):
             if not credentials.scheme == "Bearer":
                 raise AuthError("Invalid authentication scheme.")
 
-            if not self.verify_jwt(credentials.credentials):
-                raise AuthError("Invalid token or expired token.")
+            token = credentials.credentials
+            if getattr(request.state, "token", None) != token:
+                authenticated = await run_db(authenticate_token, token)
+                if not authenticated:
+                    raise AuthError("Invalid token or expired token.")
+
+                request.state.token = token
+                request.state.token_payload, request.state.current_user = authenticated
 
-            return credentials.credentials
+            return token
         else:
             raise AuthError("Invalid authorization code.")
 
     def verify_jwt(self, jwt_token: str) -> bool:
-        is_token_valid: bool = False
-        try:
-            payload = decode_jwt(jwt_token)
-        except Exception as e:
-            payload = None
-        if payload:
-            is_token_valid = True
-        return is_token_valid
+        return bool(authenticate_token(jwt_token))
@@ -0,0 +1,173 @@
+import asyncio
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+class ServerTiming:
+    """Durations collected for one request, rendered as a `Server-Timing` header
+
+    Spans of the same name are summed, e.g. every DB command adds to `db`."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.spans: dict[str, list[float]] = {}
+        self.endpoint_started_at: float | None = None
+        self.endpoint_ended_at: float | None = None
+        self.handler_ended_at: float | None = None
+
+    def add(self, name: str, duration: float) -> None:
+        span = self.spans.setdefault(name, [0.0, 0])
+        span[0] += duration
+        span[1] += 1
+
+    def as_dict(self) -> dict[str, dict]:
+        return {
+            name: {"dur": round(total * 1000, 3), "count": count}
+            for name, (total, count) in self.spans.items()
+        }
+
+    def header(self) -> str:
+        total = time.perf_counter() - self.started_at
+        return ", ".join(
+            [
+                *(
+                    f'{name};dur={duration * 1000:.3f};desc="{count}x"'
+                    for name, (duration, count) in self.spans.items()
+                ),
+                f"total;dur={total * 1000:.3f}",
+            ]
+        )
+
+
+server_timing: contextvars.ContextVar[ServerTiming | None] = contextvars.ContextVar(
+    "server_timing", default=None
+)
+
+
+active_spans: contextvars.ContextVar[frozenset[str]] = contextvars.ContextVar(
+    "active_spans", default=frozenset()
+)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Add the duration of the block to the `name` span
+
+    Only the outermost of nested spans with the same name is timed, e.g. a
+    service method calling another one counts once in `service`."""
+    timing = server_timing.get()
+    active = active_spans.get()
+    if timing is None or name in active:
+        yield
+        return
+
+    token = active_spans.set(active | {name})
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - start)
+        active_spans.reset(token)
+
+
+def timed(name: str) -> Callable:
+    """Decorator adding the duration of each call to the `name` span"""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class DBTimingListener(monitoring.CommandListener):
+    """Adds every Mongo command to the `db` span of the request running it"""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        timing = server_timing.get()
+        if timing is not None:
+            timing.add("db", event.duration_micros / 1_000_000)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self.succeeded(event)
+
+
+class TimedRoute(APIRoute):
+    """Splits the route handler into `deps`, `endpoint` and `serialize` spans
+
+    `serialize` covers response model validation and rendering, everything the
+    handler does after the endpoint returned."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, self._timed_endpoint(endpoint), **kwargs)
+
+    @staticmethod
+    def _timed_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        if asyncio.iscoroutinefunction(endpoint):
+
+            @functools.wraps(endpoint)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                timing = server_timing.get()
+                if timing is None:
+                    return await endpoint(*args, **kwargs)
+
+                timing.endpoint_started_at = time.perf_counter()
+                try:
+                    return await endpoint(*args, **kwargs)
+                finally:
+                    timing.endpoint_ended_at = time.perf_counter()
+
+            return async_wrapper
+
+        @functools.wraps(endpoint)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            timing = server_timing.get()
+            if timing is None:
+                return endpoint(*args, **kwargs)
+
+            timing.endpoint_started_at = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                timing.endpoint_ended_at = time.perf_counter()
+
+        return wrapper
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            timing = server_timing.get()
+            if timing is None:
+                return await handler(request)
+
+            started_at = time.perf_counter()
+            timing.endpoint_started_at = timing.endpoint_ended_at = None
+            try:
+                return await handler(request)
+            finally:
+                ended_at = timing.handler_ended_at = time.perf_counter()
+                if timing.endpoint_ended_at is not None:
+                    timing.add("deps", timing.endpoint_started_at - started_at)
+                    timing.add(
+                        "endpoint",
+                        timing.endpoint_ended_at - timing.endpoint_started_at,
+                    )
+                    timing.add("serialize", ended_at - timing.endpoint_ended_at)
+
+        return timed_handler
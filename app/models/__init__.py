@@ -1,13 +1,26 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 from mongoengine import connect, disconnect_all, DEFAULT_CONNECTION_NAME, Document
 from mongoengine.base.common import _get_documents_by_db
+from mongoengine.connection import get_connection
 
 from loguru import logger
+from typing import TYPE_CHECKING
 
 from app.models.house_model import House
+from app.models.indexes import sync_indexes
+from app.core.db_monitoring import CommandMonitoringListener, pool_monitors
+from app.core.timing import DBTimingListener
 
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
-async def init_mongoengine(settings) -> None:
-    host = (
+motor_client: "AsyncIOMotorClient | None" = None
+
+
+def get_database_uri(settings) -> str:
+    return (
         settings.DATABASE_URI_FORMAT
         if settings.DB_USER and settings.DB_PASSWORD
         else "{db_engine}://{host}:{port}/{database}"
@@ -19,16 +32,115 @@ async def init_mongoengine(settings) -> None:
         port=settings.DB_PORT,
         database=settings.DB_NAME,
     )
+
+
+def get_client_options(settings) -> dict:
+    """Pool, timeout and compression options shared by both clients"""
+    options = {
+        "uuidRepresentation": "standard",
+        "maxPoolSize": settings.DB_MAX_POOL_SIZE,
+        "minPoolSize": settings.DB_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": settings.DB_SERVER_SELECTION_TIMEOUT_MS,
+    }
+    if settings.DB_WAIT_QUEUE_TIMEOUT_MS is not None:
+        options["waitQueueTimeoutMS"] = settings.DB_WAIT_QUEUE_TIMEOUT_MS
+    if settings.DB_COMPRESSORS:
+        options["compressors"] = ",".join(settings.DB_COMPRESSORS)
+    return options
+
+
+def get_event_listeners(settings) -> list:
+    listeners = [DBTimingListener(), pool_monitors["mongoengine"]]
+    if settings.DB_COMMAND_MONITORING:
+        listeners.append(CommandMonitoringListener(settings.DB_SLOW_QUERY_MS))
+    return listeners
+
+
+async def init_mongoengine(settings) -> None:
+    host = get_database_uri(settings)
     logger.info("DB URI: " + host)
-    connect(host=host, uuidRepresentation="standard")
+    client = connect(
+        host=host,
+        event_listeners=get_event_listeners(settings),
+        **get_client_options(settings),
+    )
     logger.info("Initialized mongengine")
+    if settings.DB_WARM_UP:
+        await asyncio.to_thread(warm_up, client, settings.DB_MIN_POOL_SIZE)
+        log_warm_up("mongoengine", settings.DB_MIN_POOL_SIZE)
+    sync_indexes(
+        cls_documents,
+        mode=settings.INDEX_SYNC_MODE,
+        drop_undeclared=settings.INDEX_DROP_UNDECLARED,
+    )
+
+
+def warm_up(client, connections: int) -> None:
+    """Ping from `connections` threads at once so the pool opens up to that many
+
+    Not guaranteed: a ping finishing before another one checks out hands its
+    connection over, pymongo's background task opens the rest of minPoolSize."""
+    connections = max(connections, 1)
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        list(executor.map(lambda _: client.admin.command("ping"), range(connections)))
+
+
+def log_warm_up(client: str, connections: int) -> None:
+    stats = pool_monitors[client].stats()
+    if stats["connections"] < connections:
+        logger.warning(
+            f"Warmed up {client} pool with {stats['connections']} of "
+            f"{connections} connections, the rest open in the background"
+        )
+    logger.info(f"Warmed up mongo pool {stats}")
+
+
+def ping() -> None:
+    get_connection().admin.command("ping")
 
 
 async def disconnect_mongoengine() -> None:
+    logger.info(f"Mongo pool {pool_monitors['mongoengine'].stats()}")
     disconnect_all()
     logger.info("Closed all mongoengine connections")
 
 
+async def init_motor(settings) -> None:
+    # imported here, motor is only loaded when DB_ASYNC_ENABLED is set
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    global motor_client
+    motor_client = AsyncIOMotorClient(
+        get_database_uri(settings),
+        event_listeners=[pool_monitors["motor"]],
+        **get_client_options(settings),
+    )
+    logger.info("Initialized motor")
+    if settings.DB_WARM_UP:
+        await asyncio.gather(
+            *(
+                motor_client.admin.command("ping")
+                for _ in range(max(settings.DB_MIN_POOL_SIZE, 1))
+            )
+        )
+        log_warm_up("motor", settings.DB_MIN_POOL_SIZE)
+
+
+async def disconnect_motor() -> None:
+    global motor_client
+    if motor_client is not None:
+        logger.info(f"Mongo pool {pool_monitors['motor'].stats()}")
+        motor_client.close()
+        motor_client = None
+        logger.info("Closed motor connection")
+
+
+def get_motor_database() -> "AsyncIOMotorDatabase":
+    if motor_client is None:
+        raise RuntimeError("Motor client is not initialized, set DB_ASYNC_ENABLED")
+    return motor_client.get_default_database()
+
+
 cls_documents: list[Document] = _get_documents_by_db(
     DEFAULT_CONNECTION_NAME, DEFAULT_CONNECTION_NAME
 )
@@ -1,10 +1,30 @@
 import mongoengine as me
 import datetime
 
+from app.core.config import settings
+
+# index of the derived field each SEARCH_MODE queries, see app.utils.search
+SEARCH_INDEXES = {
+    "regex": [],
+    "prefix": ["name_normalized"],
+    "ngram": ["name_ngrams"],
+}
+
 
 class House(me.Document):
-    meta = {"collection": "houses"}
+    meta = {
+        "collection": "houses",
+        # reconciled at startup by app.models.indexes.sync_indexes
+        "auto_create_index": False,
+        "indexes": [
+            *SEARCH_INDEXES[settings.SEARCH_MODE],
+            ("created_date", "id"),  # keyset pagination
+        ],
+    }
     name = me.StringField(required=True)
+    # derived from name on repository writes for the SEARCH_MODE that needs them
+    name_normalized = me.StringField()
+    name_ngrams = me.ListField(me.StringField())
     width = me.FloatField(required=True)
     height = me.FloatField(required=True)
     volume = me.FloatField(required=True)
@@ -0,0 +1,169 @@
+from dataclasses import dataclass, field
+from typing import Literal
+
+from mongoengine import Document
+from mongoengine.base.metaclasses import TopLevelDocumentMetaclass
+
+from loguru import logger
+
+INDEX_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+@dataclass
+class IndexPlan:
+    document: type[Document]
+    create: list[dict] = field(default_factory=list)
+    drop: list[str] = field(default_factory=list)
+    undeclared: list[str] = field(default_factory=list)
+
+    @property
+    def collection_name(self) -> str:
+        return self.document._get_collection_name()
+
+    @property
+    def missing(self) -> list[dict]:
+        """Declared indexes absent from the collection, `create` minus changed ones"""
+        return [spec for spec in self.create if index_name(spec) not in self.drop]
+
+    def __bool__(self) -> bool:
+        return bool(self.create or self.drop or self.undeclared)
+
+
+def index_name(spec: dict) -> str:
+    """Name pymongo gives to an index created without an explicit name"""
+    return spec.get("name") or "_".join(
+        f"{name}_{direction}" for name, direction in spec["fields"]
+    )
+
+
+def top_level_documents(documents: list[type[Document]]) -> list[type[Document]]:
+    return [
+        doc
+        for doc in documents
+        if isinstance(doc, TopLevelDocumentMetaclass) and not doc._meta.get("abstract")
+    ]
+
+
+def plan_indexes(document: type[Document], drop_undeclared: bool) -> IndexPlan:
+    """Diff the indexes declared in `meta["indexes"]` with the collection"""
+    plan = IndexPlan(document)
+    existing = document._get_collection().index_information()
+    declared = {index_name(spec): spec for spec in document._meta["index_specs"]}
+
+    for name, spec in declared.items():
+        current = existing.get(name)
+        if current is None:
+            plan.create.append(spec)
+            continue
+
+        changed = [tuple(key) for key in current["key"]] != [
+            tuple(key) for key in spec["fields"]
+        ] or any(
+            (current.get(option) or None) != (spec.get(option) or None)
+            for option in INDEX_OPTIONS
+        )
+        if changed:
+            plan.drop.append(name)
+            plan.create.append(spec)
+
+    for name in existing:
+        if name != "_id_" and name not in declared:
+            (plan.drop if drop_undeclared else plan.undeclared).append(name)
+
+    return plan
+
+
+def apply_plan(plan: IndexPlan) -> None:
+    collection = plan.document._get_collection()
+    for name in plan.drop:
+        logger.info(f"Dropping index {plan.collection_name}.{name}")
+        collection.drop_index(name)
+
+    for spec in plan.create:
+        options = {
+            key: value for key, value in spec.items() if key not in ("fields", "cls")
+        }
+        options["name"] = index_name(spec)
+        logger.info(f"Building index {plan.collection_name}.{options['name']}")
+        collection.create_index(spec["fields"], **options)
+
+
+def sync_indexes(
+    documents: list[type[Document]],
+    mode: Literal["off", "create", "dry-run", "apply"],
+    drop_undeclared: bool = False,
+) -> list[IndexPlan]:
+    """Reconcile declared indexes with the collections
+
+    - ``create``: build missing indexes, only log drops and changed definitions
+    - ``dry-run``: only log the plan, warning about missing indexes
+    - ``apply``: build, rebuild and drop as planned"""
+    if mode == "off":
+        return []
+
+    plans = [
+        plan_indexes(document, drop_undeclared)
+        for document in top_level_documents(documents)
+    ]
+    for plan in plans:
+        if not plan:
+            continue
+
+        logger.info(
+            f"Index plan {plan.collection_name}: "
+            f"create={[index_name(spec) for spec in plan.create]} "
+            f"drop={plan.drop} undeclared={plan.undeclared}"
+        )
+        if mode == "apply":
+            apply_plan(plan)
+        elif mode == "create" and plan.missing:
+            apply_plan(IndexPlan(plan.document, create=plan.missing))
+        elif mode == "dry-run" and plan.missing:
+            logger.warning(
+                f"Missing indexes on {plan.collection_name}, build them with "
+                "`python scripts/indexes.py create`"
+            )
+
+    return plans
+
+
+def index_report(documents: list[type[Document]], limit: int = 20) -> list[dict]:
+    """Per collection index usage (`$indexStats`) and recent collection scans
+
+    Collection scans are read from `system.profile`, so they are only listed
+    when the database profiler is enabled (e.g. `db.setProfilingLevel(1)`)."""
+    report = []
+    for document in top_level_documents(documents):
+        collection = document._get_collection()
+        database = collection.database
+        usage = [
+            {
+                "name": stats["name"],
+                "ops": stats["accesses"]["ops"],
+                "since": stats["accesses"]["since"],
+            }
+            for stats in collection.aggregate([{"$indexStats": {}}])
+        ]
+        profiling_level = database.command("profile", -1)["was"]
+        collection_scans = [
+            {
+                "ts": entry.get("ts"),
+                "op": entry.get("op"),
+                "millis": entry.get("millis"),
+                "filter": entry.get("command", {}).get("filter"),
+            }
+            for entry in database["system.profile"]
+            .find({"ns": collection.full_name, "planSummary": "COLLSCAN"})
+            .sort("ts", -1)
+            .limit(limit)
+        ]
+        report.append(
+            {
+                "collection": collection.name,
+                "indexes": sorted(usage, key=lambda stats: stats["ops"]),
+                "profiling_level": profiling_level,
+                "collection_scans": collection_scans,
+            }
+        )
+
+    return report
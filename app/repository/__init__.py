@@ -1,2 +1,4 @@
 from app.repository.house_repository import HouseRepository
 from app.repository.base_repository import BaseRepository
+from app.repository.async_house_repository import AsyncHouseRepository
+from app.repository.async_base_repository import AsyncBaseRepository
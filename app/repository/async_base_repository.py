@@ -0,0 +1,188 @@
+import datetime
+
+from pydantic import BaseModel
+
+from bson import ObjectId
+
+from typing import TYPE_CHECKING, Any
+
+from mongoengine import Document, Q, errors
+from mongoengine.queryset import transform
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.cache import caches
+from app.core.config import settings
+from app.core.exceptions import DuplicatedError, NotFoundError, ValidationError
+from app.core.metrics import observe_db
+from app.core.query_cache import get_query_cache
+from app.models import get_motor_database
+from app.repository.base_repository import repository_cache_name
+from app.utils.search import with_search_fields
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorCursor
+
+
+class AsyncBaseRepository:
+    """Motor backed counterpart of `BaseRepository`.
+
+    The mongoengine `Document` stays the schema source: queries and updates are
+    compiled with mongoengine's transforms and validated with the document
+    fields, then sent through the async driver."""
+
+    # fields kept searchable through derived index fields, see app.utils.search
+    search_fields: tuple[str, ...] = ()
+
+    def __init__(self, model: Document):
+        self.model = model
+
+    @property
+    def collection(self) -> "AsyncIOMotorCollection":
+        return get_motor_database()[self.model._get_collection_name()]
+
+    def to_query(self, schema: BaseModel | None = None, **kwargs: Any) -> dict:
+        query = kwargs.pop("query", Q())
+        try:
+            return (
+                query
+                & Q(
+                    **{
+                        **(schema.model_dump(exclude_defaults=True) if schema else {}),
+                        **kwargs,
+                    }
+                )
+            ).to_query(self.model)
+        except (errors.InvalidQueryError, errors.ValidationError) as e:
+            raise ValidationError(detail=str(e))
+
+    def to_update(self, schema: BaseModel | None = None, **kwargs: Any) -> dict:
+        update = with_search_fields(
+            self.search_fields,
+            {
+                **(schema.model_dump(exclude_defaults=True) if schema else {}),
+                **kwargs,
+            },
+            settings.SEARCH_MODE,
+        )
+        if update and "updated_date" in self.model._fields:
+            update = {"updated_date": datetime.datetime.now(), **update}
+
+        try:
+            return transform.update(self.model, **update)
+        except Exception as e:
+            raise ValidationError(detail=str(e))
+
+    def to_document(self, son: dict) -> Document:
+        return self.model._from_son(son)
+
+    async def get_by_options(
+        self, schema: BaseModel | None = None, **kwargs: Any
+    ) -> "AsyncIOMotorCursor":
+        query = self.to_query(schema, **kwargs)
+        if not await self.collection.find_one(query, projection={"_id": True}):
+            raise NotFoundError(detail="not found")
+
+        return self.collection.find(query)
+
+    @observe_db
+    async def get_by_id(self, id: str | ObjectId) -> Document:
+        if not ObjectId.is_valid(id):
+            raise ValidationError("Invalid ObjectId")
+
+        item = await self.collection.find_one({"_id": ObjectId(id)})
+        if not item:
+            raise NotFoundError(detail=f"ObjectId('{str(id)}') not found")
+
+        return self.to_document(item)
+
+    @observe_db
+    async def create(self, schema: None | BaseModel = None, **kwargs: Any) -> Document:
+        item = self.model(
+            **with_search_fields(
+                self.search_fields,
+                {
+                    **(schema.model_dump(exclude_defaults=True) if schema else {}),
+                    **kwargs,
+                },
+                settings.SEARCH_MODE,
+            )
+        )
+        try:
+            item.validate()
+            son = item.to_mongo()
+            result = await self.collection.insert_one(son)
+        except DuplicateKeyError as e:
+            duplicate = (e.details or {}).get("keyValue", {})
+            raise DuplicatedError(detail=f"'DuplicateError': {duplicate}")
+
+        except Exception as e:
+            raise ValidationError(detail=str(e))
+
+        item.id = result.inserted_id
+        item._created = False
+        self._invalidate(item.id)
+        return item
+
+    @observe_db
+    async def update(
+        self, id: str | ObjectId, schema: BaseModel | None = None, **kwargs: Any
+    ) -> Document:
+        return await self._find_one_and_update(id, self.to_update(schema, **kwargs))
+
+    @observe_db
+    async def update_attr(
+        self, id: str | ObjectId, attr: str, value: Any
+    ) -> Document:
+        return await self._find_one_and_update(id, self.to_update(**{attr: value}))
+
+    @observe_db
+    async def whole_update(
+        self, id: str | ObjectId, schema: BaseModel | None = None, **kwargs: Any
+    ) -> Document:
+        return await self._find_one_and_update(id, self.to_update(schema, **kwargs))
+
+    @observe_db
+    async def delete_by_id(self, id: str | ObjectId) -> Document:
+        if not ObjectId.is_valid(id):
+            raise ValidationError("Invalid ObjectId")
+
+        try:
+            item = await self.collection.find_one_and_delete({"_id": ObjectId(id)})
+        except Exception as e:
+            raise ValidationError(detail=str(e))
+
+        if not item:
+            raise NotFoundError(detail=f"ObjectId('{str(id)}') not found")
+
+        self._invalidate(id)
+        return self.to_document(item)
+
+    def _invalidate(self, *ids: str | ObjectId) -> None:
+        # the get_by_id cache of the sync repository of the same model
+        cache = caches.get(repository_cache_name(self.model))
+        if cache is not None:
+            for id in ids:
+                cache.pop(ObjectId(id))
+
+        # cached list responses of the collection become stale
+        query_cache = get_query_cache()
+        if query_cache is not None:
+            query_cache.bump(self.model._get_collection_name())
+
+    async def _find_one_and_update(self, id: str | ObjectId, update: dict) -> Document:
+        if not ObjectId.is_valid(id):
+            raise ValidationError("Invalid ObjectId")
+
+        try:
+            item = await self.collection.find_one_and_update(
+                {"_id": ObjectId(id)}, update, return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            raise ValidationError(detail=str(e))
+
+        if not item:
+            raise NotFoundError(detail=f"ObjectId('{str(id)}') not found")
+
+        self._invalidate(id)
+        return self.to_document(item)
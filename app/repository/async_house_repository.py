@@ -0,0 +1,9 @@
+from app.models import House
+from app.repository.async_base_repository import AsyncBaseRepository
+
+
+class AsyncHouseRepository(AsyncBaseRepository):
+    search_fields = ("name",)
+
+    def __init__(self):
+        super().__init__(House)
@@ -8,17 +8,54 @@ from bson import ObjectId
 from typing import Any
 
 from mongoengine import Document, QuerySet, errors
+from mongoengine.queryset import transform
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
 
+from app.core.cache import MISSING, TTLCache, get_cache
+from app.core.config import settings
 from app.core.exceptions import DuplicatedError, NotFoundError, ValidationError
+from app.core.metrics import observe_db
+from app.core.query_cache import get_query_cache
+from app.core.timing import timed
+from app.utils.search import with_search_fields
+
+
+def repository_cache_name(model: type[Document]) -> str:
+    return f"repository.{model.__name__}"
 
 
 class BaseRepository:
+    # read-through get_by_id cache, enabled per subclass
+    cache_enabled: bool = False
+    # fields kept searchable through derived index fields, see app.utils.search
+    search_fields: tuple[str, ...] = ()
+
     def __init__(self, model: Document):
         self.model = model
+        self.cache: TTLCache | None = (
+            get_cache(
+                repository_cache_name(model),
+                maxsize=settings.REPOSITORY_CACHE_SIZE,
+                ttl=settings.REPOSITORY_CACHE_TTL,
+            )
+            if self.cache_enabled and settings.REPOSITORY_CACHE_ENABLED
+            else None
+        )
 
+    # not @observe_db, the returned QuerySet runs its query when it is paginated
+    @timed("repository")
     def get_by_options(
-        self, schema: BaseModel | None = None, **kwargs: Any
+        self,
+        schema: BaseModel | None = None,
+        projection: list[str] | None = None,
+        raw: bool = False,
+        **kwargs: Any,
     ) -> QuerySet:
+        """Find documents matching `schema`/`kwargs`
+
+        With `raw=True` the queryset yields plain BSON dicts instead of
+        `Document` instances, skipping mongoengine hydration for read-only use."""
         if "query" in kwargs:
             query = kwargs.pop("query")
             items = self.model.objects(
@@ -36,31 +73,109 @@ class BaseRepository:
                 }
             )
 
+        items = self._project(items, projection)
+        if raw:
+            items = items.as_pymongo()
+
         if not items:
             raise NotFoundError(detail="not found")
 
         return items
 
-    def get_by_id(self, id: str | ObjectId) -> Document:
+    # not @observe_db, cache hits are no DB calls, see _get_by_id
+    @timed("repository")
+    def get_by_id(
+        self,
+        id: str | ObjectId,
+        projection: list[str] | None = None,
+        raw: bool = False,
+    ) -> Document | dict:
         if not ObjectId.is_valid(id):
             raise ValidationError("Invalid ObjectId")
 
+        if self.cache is not None:
+            return self._get_cached(ObjectId(id), raw)
+
+        item = self._get_by_id(id, projection, raw)
+        if not item:
+            raise NotFoundError(detail=f"ObjectId('{str(id)}') not found")
+
+        return item
+
+    @observe_db
+    def _get_by_id(
+        self, id: str | ObjectId, projection: list[str] | None, raw: bool
+    ) -> Document | dict | None:
+        items = self._project(self.model.objects, projection)
+        if raw:
+            items = items.as_pymongo()
+
         try:
-            item = self.model.objects.with_id(id)
+            return items.with_id(id)
         except errors.ValidationError as e:
             raise ValidationError(detail=str(e))
 
+    def _get_cached(self, id: ObjectId, raw: bool) -> Document | dict:
+        """Whole documents are cached as BSON dicts, projections are not applied"""
+        son = self.cache.get(id)
+        if son is MISSING:
+            # a write invalidating `id` meanwhile keeps the old son out of the cache
+            version = self.cache.reserve(id)
+            try:
+                son = self._get_by_id(id, None, raw=True)
+            finally:
+                self.cache.fill(id, son or MISSING, version)
+
+            if not son:
+                raise NotFoundError(detail=f"ObjectId('{str(id)}') not found")
+
+        return dict(son) if raw else self.model._from_son(son)
+
+    # not @observe_db, like get_by_id
+    @timed("repository")
+    def get_version(self, id: str | ObjectId) -> datetime.datetime | None:
+        """`updated_date` of a document without loading the whole document"""
+        if not ObjectId.is_valid(id):
+            raise ValidationError("Invalid ObjectId")
+
+        if self.cache is not None:
+            son = self.cache.get(ObjectId(id))
+            if son is not MISSING:
+                return son.get("updated_date")
+
+        item = self._get_version(id)
         if not item:
             raise NotFoundError(detail=f"ObjectId('{str(id)}') not found")
 
-        return item
+        return item.get("updated_date")
+
+    @observe_db
+    def _get_version(self, id: str | ObjectId) -> dict | None:
+        fields = [f for f in ("id", "updated_date") if f in self.model._fields]
+        return self.model.objects.only(*fields).as_pymongo().with_id(id)
+
+    def _invalidate(self, *ids: str | ObjectId) -> None:
+        if self.cache is not None:
+            for id in ids:
+                self.cache.pop(ObjectId(id))
 
+        # every write goes through here, cached list responses become stale
+        query_cache = get_query_cache()
+        if ids and query_cache is not None:
+            query_cache.bump(self.model._get_collection_name())
+
+    @timed("repository")
+    @observe_db
     def create(self, schema: None | BaseModel = None, **kwargs: Any) -> Document:
         item = self.model(
-            **{
-                **(schema.model_dump(exclude_defaults=True) if schema else {}),
-                **kwargs,
-            }
+            **with_search_fields(
+                self.search_fields,
+                {
+                    **(schema.model_dump(exclude_defaults=True) if schema else {}),
+                    **kwargs,
+                },
+                settings.SEARCH_MODE,
+            )
         )
         try:
             item.save()
@@ -72,54 +187,214 @@ class BaseRepository:
         except Exception as e:
             raise ValidationError(detail=str(e))
 
-        return self.get_by_id(item.id)
+        self._invalidate(item.id)
+        return item
 
+    @timed("repository")
+    @observe_db
     def update(
         self, id: str | ObjectId, schema: BaseModel | None = None, **kwargs: Any
     ) -> Document:
-        item = self.get_by_id(id)
-        try:
-            item.update(
-                **{
-                    **(schema.model_dump(exclude_defaults=True) if schema else {}),
-                    **kwargs,
-                }
-            )
-        except Exception as e:
-            raise ValidationError(detail=str(e))
-
-        return self.get_by_id(id)
+        return self._modify(
+            id,
+            **{
+                **(schema.model_dump(exclude_defaults=True) if schema else {}),
+                **kwargs,
+            },
+        )
 
+    @timed("repository")
+    @observe_db
     def update_attr(self, id: str | ObjectId, attr: str, value: Any) -> Document:
-        item = self.get_by_id(id)
-        try:
-            item.update(**{attr: value})
-        except Exception as e:
-            raise ValidationError(detail=str(e))
-
-        return self.get_by_id(id)
+        return self._modify(id, **{attr: value})
 
+    @timed("repository")
+    @observe_db
     def whole_update(
         self, id: str | ObjectId, schema: BaseModel | None = None, **kwargs: Any
     ) -> Document:
-        item = self.get_by_id(id)
+        return self._modify(
+            id,
+            **{
+                **(schema.model_dump(exclude_defaults=True) if schema else {}),
+                **kwargs,
+            },
+        )
+
+    @timed("repository")
+    @observe_db
+    def delete_by_id(self, id: str | ObjectId) -> Document:
+        if self.model._meta.get("delete_rules"):
+            # reverse delete rules are only applied by Document.delete()
+            item = self.get_by_id(id)
+            try:
+                item.delete()
+            except Exception as e:
+                raise ValidationError(detail=str(e))
+
+            self._invalidate(id)
+            return item
+
+        return self._modify(id, remove=True)
+
+    @timed("repository")
+    @observe_db
+    def bulk_create(self, schemas: list[BaseModel]) -> list[dict]:
+        results, operations, indexes = [], [], []
+        for index, schema in enumerate(schemas):
+            item = self.model(
+                **with_search_fields(
+                    self.search_fields,
+                    schema.model_dump(exclude_defaults=True),
+                    settings.SEARCH_MODE,
+                )
+            )
+            try:
+                item.validate()
+            except errors.ValidationError as e:
+                results.append({"index": index, "status": "invalid", "error": str(e)})
+                continue
+
+            son = item.to_mongo()
+            son["_id"] = ObjectId()
+            operations.append(InsertOne(son))
+            indexes.append(index)
+            results.append({"index": index, "id": son["_id"], "status": "created"})
+
+        return self._bulk_write(operations, indexes, results)
+
+    @timed("repository")
+    @observe_db
+    def bulk_update(
+        self, items: list[tuple[str | ObjectId, BaseModel | dict]]
+    ) -> list[dict]:
+        results, operations, indexes = [], [], []
+        for index, (id, schema) in enumerate(items):
+            if not ObjectId.is_valid(id):
+                results.append(
+                    {"index": index, "status": "invalid", "error": "Invalid ObjectId"}
+                )
+                continue
+
+            data = (
+                schema.model_dump(exclude_defaults=True)
+                if isinstance(schema, BaseModel)
+                else schema
+            )
+            try:
+                update = transform.update(self.model, **self._prepare_update(data))
+                if not update:
+                    raise errors.OperationError("No updates have been specified")
+            except Exception as e:
+                results.append({"index": index, "status": "invalid", "error": str(e)})
+                continue
+
+            operations.append(UpdateOne({"_id": ObjectId(id)}, update))
+            indexes.append(index)
+            results.append({"index": index, "id": ObjectId(id), "status": "updated"})
+
+        self._mark_missing(results, indexes)
+        return self._bulk_write(operations, indexes, results)
+
+    @timed("repository")
+    @observe_db
+    def bulk_delete(self, ids: list[str | ObjectId]) -> list[dict]:
+        results, operations, indexes = [], [], []
+        for index, id in enumerate(ids):
+            if not ObjectId.is_valid(id):
+                results.append(
+                    {"index": index, "status": "invalid", "error": "Invalid ObjectId"}
+                )
+                continue
+
+            operations.append(DeleteOne({"_id": ObjectId(id)}))
+            indexes.append(index)
+            results.append({"index": index, "id": ObjectId(id), "status": "deleted"})
+
+        self._mark_missing(results, indexes)
+        return self._bulk_write(operations, indexes, results)
+
+    def _mark_missing(self, results: list[dict], indexes: list[int]) -> None:
+        """Flag ids that do not exist with a single `$in` query"""
+        if not indexes:
+            return
+
+        found = {
+            item["_id"]
+            for item in self.model._get_collection().find(
+                {"_id": {"$in": [results[i]["id"] for i in indexes]}},
+                projection={"_id": True},
+            )
+        }
+        for i in indexes:
+            if results[i]["id"] not in found:
+                results[i].update(
+                    status="not_found",
+                    error=f"ObjectId('{str(results[i]['id'])}') not found",
+                )
+
+    def _bulk_write(
+        self, operations: list, indexes: list[int], results: list[dict]
+    ) -> list[dict]:
+        """Run `operations` as one unordered bulk write and map errors per item
+
+        `indexes[i]` is the position in `results` of `operations[i]`."""
+        pending = [
+            (operation, index)
+            for operation, index in zip(operations, indexes)
+            if results[index]["status"] != "not_found"
+        ]
+        if not pending:
+            return results
+
         try:
-            item.update(
-                **{
-                    **(schema.model_dump(exclude_defaults=True) if schema else {}),
-                    **kwargs,
-                }
+            self.model._get_collection().bulk_write(
+                [operation for operation, _ in pending], ordered=False
             )
-        except Exception as e:
-            raise ValidationError(detail=str(e))
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                result = results[pending[error["index"]][1]]
+                if error.get("code") == 11000:
+                    result.update(
+                        status="duplicated",
+                        error=f"'DuplicateError': {error.get('keyValue', {})}",
+                    )
+                else:
+                    result.update(status="invalid", error=error.get("errmsg"))
+        finally:
+            self._invalidate(*(results[index]["id"] for _, index in pending))
 
-        return self.get_by_id(id)
+        return results
+
+    def _prepare_update(self, update: dict) -> dict:
+        """Refresh derived search fields and bump `updated_date` (used by ETags)"""
+        update = with_search_fields(self.search_fields, update, settings.SEARCH_MODE)
+        if update and "updated_date" in self.model._fields:
+            return {"updated_date": datetime.datetime.now(), **update}
+        return update
+
+    def _project(self, items: QuerySet, projection: list[str] | None) -> QuerySet:
+        """Only load the document fields named in `projection`"""
+        if projection:
+            items = items.only(*[f for f in projection if f in self.model._fields])
+        return items
+
+    def _modify(
+        self, id: str | ObjectId, remove: bool = False, **update: Any
+    ) -> Document:
+        """Atomic findAndModify returning the updated (or removed) document"""
+        if not ObjectId.is_valid(id):
+            raise ValidationError("Invalid ObjectId")
 
-    def delete_by_id(self, id: str | ObjectId) -> Document:
-        item = self.get_by_id(id)
         try:
-            item.delete()
+            item = self.model.objects(id=id).modify(
+                remove=remove, new=not remove, **self._prepare_update(update)
+            )
         except Exception as e:
             raise ValidationError(detail=str(e))
 
+        self._invalidate(id)
+        if not item:
+            raise NotFoundError(detail=f"ObjectId('{str(id)}') not found")
+
         return item
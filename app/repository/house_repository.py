@@ -3,5 +3,8 @@ from app.repository.base_repository import BaseRepository
 
 
 class HouseRepository(BaseRepository):
+    cache_enabled = True
+    search_fields = ("name",)
+
     def __init__(self):
         super().__init__(House)
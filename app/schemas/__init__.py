@@ -1,2 +1,7 @@
-from app.schemas.base_schema import BaseSchema, BaseSchemaInfo
+from app.schemas.base_schema import (
+    BaseSchema,
+    BaseSchemaInfo,
+    BulkItemResult,
+    BulkResult,
+)
 from app.schemas.house_schema import *
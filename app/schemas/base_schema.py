@@ -1,7 +1,8 @@
 import datetime
+from typing import Literal, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
-from app.utils import PydanticObjectId, PyObjectId
+from app.utils import DateTime, PydanticObjectId, PyObjectId
 
 
 class BaseSchema(BaseModel):
@@ -17,8 +18,8 @@ class BaseSchemaInfo(BaseSchema):
         alias="_id", serialization_alias="id"
     )  # serialization_alias made not require response_model_by_alias=False in api router
 
-    created_date: datetime.datetime
-    updated_date: datetime.datetime
+    created_date: DateTime
+    updated_date: DateTime
 
 
 class FindBase(BaseSchema):
@@ -35,3 +36,25 @@ class FindResult(BaseSchema):
 
 class FindDateRange(BaseSchema):
     ...
+
+
+class BulkItemResult(BaseSchema):
+    index: int
+    id: Optional[PydanticObjectId] = None
+    status: Literal[
+        "created", "updated", "deleted", "duplicated", "invalid", "not_found"
+    ]
+    error: Optional[str] = None
+
+
+class BulkResult(BaseSchema):
+    items: list[BulkItemResult]
+    succeeded: int
+    failed: int
+
+    @classmethod
+    def from_items(cls, items: list[dict]) -> "BulkResult":
+        succeeded = sum(
+            1 for item in items if item["status"] in ("created", "updated", "deleted")
+        )
+        return cls(items=items, succeeded=succeeded, failed=len(items) - succeeded)
@@ -12,6 +12,11 @@ class BaseHouse(BaseSchema):
     volume: float
 
 
+class PatchHouseItem(BaseSchema):
+    id: str
+    house: BaseHouse
+
+
 class FindHouse(FindBase):
     name: Optional[str] = None
 
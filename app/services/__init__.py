@@ -1,2 +1,4 @@
 from app.services.base_service import BaseService
 from app.services.house_service import HouseService
+from app.services.async_base_service import AsyncBaseService
+from app.services.async_house_service import AsyncHouseService
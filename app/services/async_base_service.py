@@ -0,0 +1,40 @@
+from pydantic import BaseModel
+from mongoengine import Document
+from typing import TYPE_CHECKING, Any
+from app.repository import AsyncBaseRepository
+from bson import ObjectId
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorCursor
+
+
+class AsyncBaseService:
+    def __init__(self, repository: AsyncBaseRepository):
+        self._repository: AsyncBaseRepository = repository
+
+    async def get_list(
+        self, schema: BaseModel | None = None, **kwargs: Any
+    ) -> "AsyncIOMotorCursor":
+        return await self._repository.get_by_options(schema, **kwargs)
+
+    async def get_by_id(self, id: str | ObjectId) -> Document:
+        return await self._repository.get_by_id(id)
+
+    async def create(self, schema: BaseModel | None = None, **kwargs: Any) -> Document:
+        return await self._repository.create(schema, **kwargs)
+
+    async def patch(
+        self, id: str | ObjectId, schema: BaseModel | None = None, **kwargs: Any
+    ) -> Document:
+        return await self._repository.update(id, schema, **kwargs)
+
+    async def patch_attr(self, id: str | ObjectId, attr: str, value: Any) -> Document:
+        return await self._repository.update_attr(id, attr, value)
+
+    async def put_update(
+        self, id: str | ObjectId, schema: BaseModel | None = None, **kwargs: Any
+    ) -> Document:
+        return await self._repository.whole_update(id, schema, **kwargs)
+
+    async def delete_by_id(self, id: str | ObjectId) -> Document:
+        return await self._repository.delete_by_id(id)
@@ -0,0 +1,25 @@
+from app.repository.async_house_repository import AsyncHouseRepository
+from app.services.async_base_service import AsyncBaseService
+from app.schemas.house_schema import FindHouse
+from app.core.config import settings
+from app.utils.search import search_query
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorCursor
+
+
+class AsyncHouseService(AsyncBaseService):
+    def __init__(self):
+        house_repository = AsyncHouseRepository()
+        super().__init__(house_repository)
+
+    async def find_house(self, schema: FindHouse) -> "AsyncIOMotorCursor":
+        schema_dict = schema.model_dump(exclude_defaults=True)
+        query_schema_dict = {}
+        if "name" in schema_dict:
+            query_schema_dict["query"] = search_query(
+                "name", schema_dict.pop("name"), settings.SEARCH_MODE
+            )
+
+        return await self.get_list(**query_schema_dict)
@@ -1,7 +1,9 @@
+import datetime
 from pydantic import BaseModel
 from mongoengine import Document, QuerySet
 from typing import Any
 from app.repository import BaseRepository
+from app.core.timing import timed
 from bson import ObjectId
 
 
@@ -9,27 +11,63 @@ class BaseService:
     def __init__(self, repository: BaseRepository):
         self._repository: BaseRepository = repository
 
-    def get_list(self, schema: BaseModel | None = None, **kwargs: Any) -> QuerySet:
-        return self._repository.get_by_options(schema, **kwargs)
+    @timed("service")
+    def get_list(
+        self,
+        schema: BaseModel | None = None,
+        projection: list[str] | None = None,
+        raw: bool = False,
+        **kwargs: Any,
+    ) -> QuerySet:
+        return self._repository.get_by_options(schema, projection, raw, **kwargs)
 
-    def get_by_id(self, id: str | ObjectId) -> Document:
-        return self._repository.get_by_id(id)
+    @timed("service")
+    def get_by_id(
+        self,
+        id: str | ObjectId,
+        projection: list[str] | None = None,
+        raw: bool = False,
+    ) -> Document | dict:
+        return self._repository.get_by_id(id, projection, raw)
 
+    @timed("service")
+    def get_version(self, id: str | ObjectId) -> datetime.datetime | None:
+        return self._repository.get_version(id)
+
+    @timed("service")
     def create(self, schema: BaseModel | None = None, **kwargs: Any) -> Document:
         return self._repository.create(schema, **kwargs)
 
+    @timed("service")
     def patch(
         self, id: str | ObjectId, schema: BaseModel | None = None, **kwargs: Any
     ) -> Document:
         return self._repository.update(id, schema, **kwargs)
 
+    @timed("service")
     def patch_attr(self, id: str | ObjectId, attr: str, value: Any) -> Document:
         return self._repository.update_attr(id, attr, value)
 
+    @timed("service")
     def put_update(
         self, id: str | ObjectId, schema: BaseModel | None = None, **kwargs: Any
     ) -> Document:
         return self._repository.whole_update(id, schema, **kwargs)
 
+    @timed("service")
     def delete_by_id(self, id: str | ObjectId) -> Document:
         return self._repository.delete_by_id(id)
+
+    @timed("service")
+    def bulk_create(self, schemas: list[BaseModel]) -> list[dict]:
+        return self._repository.bulk_create(schemas)
+
+    @timed("service")
+    def bulk_patch(
+        self, items: list[tuple[str | ObjectId, BaseModel | dict]]
+    ) -> list[dict]:
+        return self._repository.bulk_update(items)
+
+    @timed("service")
+    def bulk_delete(self, ids: list[str | ObjectId]) -> list[dict]:
+        return self._repository.bulk_delete(ids)
@@ -1,6 +1,9 @@
 from app.repository.house_repository import HouseRepository
 from app.services.base_service import BaseService
 from app.schemas.house_schema import FindHouse
+from app.core.config import settings
+from app.utils.search import search_query
+from app.core.timing import timed
 from app import models
 from mongoengine import QuerySet
 
@@ -10,10 +13,18 @@ class HouseService(BaseService):
         house_repository = HouseRepository()
         super().__init__(house_repository)
 
-    def find_house(self, schema: FindHouse) -> QuerySet:
+    @timed("service")
+    def find_house(
+        self,
+        schema: FindHouse,
+        projection: list[str] | None = None,
+        raw: bool = False,
+    ) -> QuerySet:
         schema_dict = schema.model_dump(exclude_defaults=True)
         query_schema_dict = {}
         if "name" in schema_dict:
-            query_schema_dict["name__icontains"] = schema_dict.pop("name")
+            query_schema_dict["query"] = search_query(
+                "name", schema_dict.pop("name"), settings.SEARCH_MODE
+            )
 
-        return self.get_list(**query_schema_dict)
+        return self.get_list(projection=projection, raw=raw, **query_schema_dict)
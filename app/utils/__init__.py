@@ -1 +1 @@
-from app.utils.schema import AllOptional, PydanticObjectId, PyObjectId
+from app.utils.schema import AllOptional, DateTime, PydanticObjectId, PyObjectId
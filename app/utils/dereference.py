@@ -0,0 +1,87 @@
+import functools
+from typing import Any
+
+from bson import DBRef
+from mongoengine import Document
+
+from app.models import cls_documents
+from app.models.indexes import top_level_documents
+
+
+@functools.lru_cache(maxsize=None)
+def collection_documents() -> dict[str, type[Document]]:
+    """Collection name -> Document class, built once from `cls_documents`"""
+    return {
+        document._get_collection_name(): document
+        for document in top_level_documents(cls_documents)
+    }
+
+
+def document_for_collection(collection: str) -> type[Document] | None:
+    return collection_documents().get(collection)
+
+
+def _collect_refs(value: Any, refs: dict[str, set]) -> None:
+    if isinstance(value, DBRef):
+        refs.setdefault(value.collection, set()).add(value.id)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect_refs(item, refs)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _collect_refs(item, refs)
+
+
+def _replace_refs(value: Any, resolved: dict[tuple[str, Any], dict]) -> Any:
+    if isinstance(value, DBRef):
+        # unresolved refs (dangling or unknown collection) are kept as is
+        return resolved.get((value.collection, value.id), value)
+    if isinstance(value, dict):
+        return {key: _replace_refs(item, resolved) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_replace_refs(item, resolved) for item in value]
+    return value
+
+
+def dereference(items: list[dict | Document], depth: int = 1) -> list[dict]:
+    """Replace the `DBRef`s of raw items with the referenced documents
+
+    Refs are collected over all items and resolved with one `$in` query per
+    collection and per level. `depth` is how many levels of references are
+    followed, refs found in documents beyond it are left as `DBRef`. Documents
+    are converted to their BSON dicts first, so the result can be validated
+    with `DeDBRef` fields without a query per reference."""
+    items = [
+        item.to_mongo().to_dict() if isinstance(item, Document) else item
+        for item in items
+    ]
+    resolved: dict[tuple[str, Any], dict] = {}
+    pending: list[Any] = items
+
+    for _ in range(depth):
+        refs: dict[str, set] = {}
+        _collect_refs(pending, refs)
+        pending = []
+        for collection, ids in refs.items():
+            ids = {ref_id for ref_id in ids if (collection, ref_id) not in resolved}
+            document = document_for_collection(collection)
+            if not ids or document is None:
+                continue
+
+            query = {"_id": {"$in": list(ids)}}
+            for son in document._get_collection().find(query):
+                resolved[(collection, son["_id"])] = son
+                pending.append(son)
+
+        if not pending:
+            break
+
+    if not resolved:
+        return items
+
+    # refs inside resolved documents are replaced up to `depth` levels only
+    for _ in range(depth - 1):
+        resolved = {
+            key: _replace_refs(son, resolved) for key, son in resolved.items()
+        }
+    return [_replace_refs(item, resolved) for item in items]
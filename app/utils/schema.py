@@ -1,17 +1,19 @@
+import datetime
 from typing import Any, Optional, Annotated, TypeVar, Generic, Union, get_args
 
 from bson import ObjectId, DBRef
 from bson.errors import InvalidId
 from mongoengine import Document
-from mongoengine.base.metaclasses import TopLevelDocumentMetaclass
 
 from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler, BaseModel
 from pydantic.json_schema import JsonSchemaValue
 from pydantic.main import _model_construction
+from pydantic.functional_serializers import PlainSerializer
 from pydantic.functional_validators import BeforeValidator
 from pydantic_core import CoreSchema, core_schema
 
-from app.models import cls_documents
+from app.utils.dereference import document_for_collection
+from app.core.config import settings
 from app.core.exceptions import ValidationError
 
 from loguru import logger
@@ -32,6 +34,12 @@ class AllOptional(_model_construction.ModelMetaclass):
 
 
 PyObjectId = Annotated[str, BeforeValidator(str)]
+DateTime = Annotated[
+    datetime.datetime,
+    PlainSerializer(
+        lambda value: value.strftime(settings.DATETIME_FORMAT), when_used="json"
+    ),
+]
 T = TypeVar("T")
 
 
@@ -115,11 +123,17 @@ class PydanticDBRef(DBRef):
 class DeDBRef(Generic[T]):
     """Dereference DBRef bson object to a schema
 
+    References left as `DBRef` are fetched one by one, resolve a whole page
+    with `app.utils.dereference.dereference` before validating it.
+
     Usage:
     .. code-block:: python
         from user_schema import User
 
-        user: DeDBRef[User] = Field(json_schema_extra="user_field")"""
+        user: DeDBRef[User] = Field(json_schema_extra="user_field")
+
+        paginate_raw(queryset, transformer=lambda items: dereference(items, depth=1))
+    """
 
     def __init__(self, document_class: BaseModel):
         self.document_class = document_class
@@ -129,22 +143,29 @@ class DeDBRef(Generic[T]):
         def validate(v: Union[DBRef, T], validation_info: core_schema.ValidationInfo):
             document_class: BaseModel = get_args(source_type)[0]
 
-            if isinstance(v, (dict, BaseModel)):
+            if isinstance(v, document_class):
                 return v
 
+            # raw dicts come from `dereference`, only the schema fields are kept
+            # and `_id` is read through the `id` alias
+            if isinstance(v, dict):
+                return document_class.model_validate(v)
+
+            if isinstance(v, BaseModel):
+                return document_class.model_validate(v, from_attributes=True)
+
             if isinstance(v, Document):
-                return document_class(**v.to_mongo())
+                return document_class.model_validate(v.to_mongo())
 
             if isinstance(v, DBRef):
-                for doc in cls_documents:
-                    if isinstance(doc, TopLevelDocumentMetaclass):
-                        if doc._get_collection_name() == v.collection:
-                            try:
-                                return document_class(
-                                    **doc.objects.with_id(v.id).to_mongo()
-                                )
-                            except Exception as e:
-                                raise ValidationError("Could not validate DBRef object")
+                # one query per reference, run `dereference` on the items first
+                doc = document_for_collection(v.collection)
+                if doc is not None:
+                    try:
+                        son = doc.objects.as_pymongo().with_id(v.id)
+                        return document_class.model_validate(son)
+                    except Exception as e:
+                        raise ValidationError("Could not validate DBRef object")
             return None
 
         return validate
@@ -160,4 +181,11 @@ class DeDBRef(Generic[T]):
             json_schema=core_schema.typed_dict_schema(
                 {"attr": core_schema.typed_dict_field(core_schema.str_schema())}
             ),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda instance, info: instance.model_dump(
+                    mode=info.mode, by_alias=info.by_alias
+                ),
+                info_arg=True,
+                when_used="unless-none",
+            ),
         )
@@ -0,0 +1,86 @@
+import unicodedata
+from typing import Any, Literal
+
+from mongoengine import Q
+
+NGRAM_SIZE = 3
+
+SearchMode = Literal["regex", "prefix", "ngram"]
+
+
+def normalize(value: str) -> str:
+    return unicodedata.normalize("NFKC", value).casefold()
+
+
+def ngrams(value: str) -> list[str]:
+    """Every substring of 1 to `NGRAM_SIZE` characters of the normalized value
+
+    A term of up to `NGRAM_SIZE` characters is contained in the value exactly
+    when it is one of these tokens, longer terms are narrowed by their
+    `NGRAM_SIZE`-grams through the multikey index."""
+    value = normalize(value)
+    return sorted(
+        {
+            value[i : i + n]
+            for n in range(1, NGRAM_SIZE + 1)
+            for i in range(len(value) - n + 1)
+        }
+    )
+
+
+def with_search_fields(
+    fields: tuple[str, ...], data: dict[str, Any], mode: SearchMode
+) -> dict:
+    """Add the derived search values `mode` queries to a write
+
+    ``prefix`` needs `<field>_normalized`, ``ngram`` also `<field>_ngrams`,
+    ``regex`` queries the field itself and derives nothing."""
+    if mode == "regex":
+        return data
+
+    data = dict(data)
+    for field in fields:
+        for key, prefix in ((field, ""), (f"set__{field}", "set__")):
+            if isinstance(data.get(key), str):
+                data[f"{prefix}{field}_normalized"] = normalize(data[key])
+                if mode == "ngram":
+                    data[f"{prefix}{field}_ngrams"] = ngrams(data[key])
+    return data
+
+
+def search_key(term: str, mode: SearchMode) -> str:
+    """Canonical `term`, terms with the same key match the same documents"""
+    term = term.strip()
+    if mode == "regex":
+        return term.lower()
+    return normalize(term)
+
+
+def search_query(field: str, term: str, mode: SearchMode) -> Q:
+    """Case-insensitive match of `term` in `field`
+
+    - ``regex``: unanchored `icontains`, scans the collection
+    - ``prefix``: starts-with on `<field>_normalized`, uses its index
+    - ``ngram``: contains through `<field>_ngrams`, same results as ``regex``
+
+    Surrounding whitespace of `term` is ignored."""
+    term = term.strip()
+    if not term:
+        return Q()
+
+    if mode == "prefix":
+        return Q(**{f"{field}_normalized__startswith": normalize(term)})
+
+    if mode == "ngram":
+        term = normalize(term)
+        if len(term) <= NGRAM_SIZE:
+            return Q(**{f"{field}_ngrams": term})
+
+        grams = sorted(
+            {term[i : i + NGRAM_SIZE] for i in range(len(term) - NGRAM_SIZE + 1)}
+        )
+        return Q(
+            **{f"{field}_ngrams__all": grams, f"{field}_normalized__contains": term}
+        )
+
+    return Q(**{f"{field}__icontains": term})
@@ -0,0 +1,67 @@
+"""Fill the derived search fields (see app.utils.search) of existing documents
+
+Run once before switching `SEARCH_MODE` to ``prefix`` or ``ngram``, with the
+new mode set: only the fields of that mode are derived and indexed, new writes
+through the repositories then keep them up to date.
+
+    APP_ENV=dev SEARCH_MODE=ngram python scripts/backfill-search.py
+"""
+import argparse
+import asyncio
+import sys
+
+sys.path.insert(0, ".")
+
+from pymongo import UpdateOne  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.models import init_mongoengine, disconnect_mongoengine  # noqa: E402
+from app.repository import HouseRepository  # noqa: E402
+from app.utils.search import with_search_fields  # noqa: E402
+
+REPOSITORIES = [HouseRepository]
+
+
+def backfill(repository, batch_size: int) -> int:
+    if settings.SEARCH_MODE == "regex":
+        return 0  # queries the fields themselves, nothing to derive
+
+    collection = repository.model._get_collection()
+    updated, operations = 0, []
+    for field in repository.search_fields:
+        cursor = collection.find(
+            {field: {"$type": "string"}},
+            projection={field: True},
+            batch_size=batch_size,
+        )
+        for item in cursor:
+            derived = with_search_fields(
+                (field,), {field: item[field]}, settings.SEARCH_MODE
+            )
+            derived.pop(field)
+            operations.append(UpdateOne({"_id": item["_id"]}, {"$set": derived}))
+            if len(operations) >= batch_size:
+                result = collection.bulk_write(operations, ordered=False)
+                updated += result.modified_count
+                operations = []
+
+    if operations:
+        result = collection.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+    return updated
+
+
+def main(batch_size: int):
+    asyncio.run(init_mongoengine(settings))
+    for repository_class in REPOSITORIES:
+        repository = repository_class()
+        updated = backfill(repository, batch_size)
+        print(f"{repository.model.__name__}: {updated} documents updated")
+    asyncio.run(disconnect_mongoengine())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.batch_size)
@@ -0,0 +1,118 @@
+"""Requests/sec through the previous `@app.middleware("http")` process time
+middleware vs `ProcessTimeMiddleware`
+
+The ASGI apps are driven in-process, so the numbers only reflect middleware
+overhead (no network, no server).
+
+    python scripts/bench-middleware.py --requests 20000
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from fastapi import FastAPI, Request, Response, status  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from loguru import logger  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.middleware import ProcessTimeMiddleware  # noqa: E402
+
+
+def base_http_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def add_process_time_header(request: Request, call_next):
+        user_agent = request.headers.get("user-agent", "")
+        logger.debug(f"user-agent ==> {user_agent}")
+        for agent in settings.DISALLOW_AGENTS:
+            if agent in user_agent.lower():
+                logger.warning({"detail": "Client is not allow to uses."})
+
+                return JSONResponse(
+                    status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                    content={"detail": "Client is not allow to uses."},
+                )
+
+        start_time = time.time()
+        response: Response = await call_next(request)
+        process_time = time.time() - start_time
+        response.headers["X-Process-Time"] = "{:0.6f}".format(process_time)
+        return response
+
+    @app.get("/")
+    async def root():
+        return {"message": "service is working"}
+
+    return app
+
+
+def asgi_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ProcessTimeMiddleware, disallow_agents=settings.DISALLOW_AGENTS)
+
+    @app.get("/")
+    async def root():
+        return {"message": "service is working"}
+
+    return app
+
+
+async def call(app, user_agent: bytes) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"user-agent", user_agent)],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]["status"]
+
+
+async def bench(name: str, app, requests: int, user_agent: bytes) -> float:
+    assert await call(app, user_agent) in (200, 406)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(app, user_agent)
+    rate = requests / (time.perf_counter() - start)
+    print(f"{name:>14}: {rate:10,.0f} req/sec")
+    return rate
+
+
+async def main(requests: int):
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+    for label, user_agent in (
+        ("allowed", b"Mozilla/5.0 (X11; Linux x86_64) Firefox/118.0"),
+        ("blocked", b"curl/8.4.0"),
+    ):
+        print(f"{label} user agent")
+        before = await bench("base http", base_http_app(), requests, user_agent)
+        after = await bench("pure asgi", asgi_app(), requests, user_agent)
+        print(f"{'speedup':>14}: {after / before:10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
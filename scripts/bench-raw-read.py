@@ -0,0 +1,68 @@
+"""Rows/sec of the Document read path vs the raw BSON dict read path
+
+Needs a reachable MongoDB configured the same way as the app (`DB_*` settings).
+Rows are written to a temporary `houses_bench` collection that is dropped at
+the end.
+
+    APP_ENV=dev python scripts/bench-raw-read.py --rows 20000 --repeat 5
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from mongoengine.context_managers import switch_collection  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.models import House, init_mongoengine, disconnect_mongoengine  # noqa: E402
+from app.schemas.house_schema import ResponseHouse  # noqa: E402
+
+
+def document_path(queryset) -> list:
+    # what fastapi_pagination.ext.mongoengine.paginate does per row
+    return [ResponseHouse.model_validate(item.to_mongo()) for item in queryset]
+
+
+def raw_path(queryset) -> list:
+    return [ResponseHouse.model_validate(item) for item in queryset.as_pymongo()]
+
+
+def bench(name, func, queryset, rows, repeat) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(queryset.clone())
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:>10}: {rows / best:12,.0f} rows/sec (best of {repeat})")
+    return rows / best
+
+
+def main(rows: int, repeat: int):
+    asyncio.run(init_mongoengine(settings))
+    with switch_collection(House, "houses_bench") as BenchHouse:
+        collection = BenchHouse._get_collection()
+        collection.drop()
+        collection.insert_many(
+            BenchHouse(
+                name=f"house {i}", width=i * 1.5, height=i * 2.5, volume=i * 3.5
+            ).to_mongo()
+            for i in range(rows)
+        )
+        try:
+            queryset = BenchHouse.objects
+            document = bench("document", document_path, queryset, rows, repeat)
+            raw = bench("raw", raw_path, queryset, rows, repeat)
+            print(f"{'speedup':>10}: {raw / document:12.2f}x")
+        finally:
+            collection.drop()
+    asyncio.run(disconnect_mongoengine())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,84 @@
+"""Import time of the app and time to first request of a fresh uvicorn process
+
+Time to first request covers the lifespan (router registration, Mongo
+connection, index sync), so it needs a reachable MongoDB configured the same
+way as the app (`DB_*` settings).
+
+    APP_ENV=dev python scripts/bench-startup.py --repeat 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+def import_time(top: int) -> float:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    # "import time: self [us] | cumulative | imported package"
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not name.startswith("  "):  # top level imports only
+            modules.append((int(cumulative), name.strip()))
+    for cumulative, name in sorted(modules, reverse=True)[:top]:
+        print(f"{name:>40}: {cumulative / 1000:8.1f} ms")
+    return elapsed
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_request_time(timeout: float) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=os.environ.copy(),
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/") as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"no response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(repeat: int, top: int, timeout: float):
+    imports = [import_time(top if i == 0 else 0) for i in range(repeat)]
+    print(f"{'import app':>40}: {statistics.median(imports) * 1000:8.1f} ms (median)")
+    first = [first_request_time(timeout) for _ in range(repeat)]
+    print(f"{'first request':>40}: {statistics.median(first) * 1000:8.1f} ms (median)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports shown")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+    main(args.repeat, args.top, args.timeout)
@@ -0,0 +1,112 @@
+"""Requests/sec of `python -m app` with 1 worker vs N workers
+
+Starts the server for each worker count, waits until it is ready and drives
+it with keep-alive clients spread over several processes so the load
+generator is not the bottleneck. Needs a reachable MongoDB configured the
+same way as the app (`DB_*` settings), unless only routes without DB access
+are measured and readiness is taken from one of them. Run it on the target
+machine type.
+
+    APP_ENV=prod python scripts/bench-workers.py --workers 1 4 --duration 20
+    APP_ENV=prod python scripts/bench-workers.py --path "/api/v1/house/?size=50"
+    APP_ENV=prod INDEX_SYNC_MODE=off python scripts/bench-workers.py --ready-path /
+"""
+import argparse
+import asyncio
+import multiprocessing
+import subprocess
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, ".")
+
+from app.core.config import settings  # noqa: E402
+
+
+async def client(port: int, path: str, deadline: float) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: bench\r\nUser-Agent: bench-workers\r\n\r\n"
+    ).encode()
+    done = 0
+    try:
+        while time.perf_counter() < deadline:
+            writer.write(request)
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in headers.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            done += 1
+    finally:
+        writer.close()
+    return done
+
+
+def load_process(port: int, path: str, connections: int, duration: float) -> int:
+    async def run() -> int:
+        deadline = time.perf_counter() + duration
+        counts = await asyncio.gather(
+            *(client(port, path, deadline) for _ in range(connections))
+        )
+        return sum(counts)
+
+    return asyncio.run(run())
+
+
+def wait_ready(port: int, path: str, timeout: float = 60.0) -> None:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            url = f"http://127.0.0.1:{port}{path}"
+            with urllib.request.urlopen(url) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError("server did not become ready")
+
+
+def bench(workers: int, args) -> float:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app", "--workers", str(workers)]
+        + ["--port", str(args.port), "--loop", args.loop, "--http", args.http],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(args.port, args.ready_path)
+        # warm up every worker's pool and caches
+        load_process(args.port, args.path, args.connections, 2.0)
+        with multiprocessing.Pool(args.clients) as pool:
+            counts = pool.starmap(
+                load_process,
+                [(args.port, args.path, args.connections, args.duration)]
+                * args.clients,
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+    rate = sum(counts) / args.duration
+    print(f"{workers:>3} workers: {rate:10,.0f} req/sec")
+    return rate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--ready-path", default=settings.READINESS_PATH)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--clients", type=int, default=4, help="load processes")
+    parser.add_argument("--connections", type=int, default=32, help="per process")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--loop", default="auto")
+    parser.add_argument("--http", default="auto")
+    args = parser.parse_args()
+
+    rates = [bench(workers, args) for workers in args.workers]
+    print(f"{'speedup':>11}: {rates[-1] / rates[0]:10.2f}x")
@@ -0,0 +1,39 @@
+"""Write app/api/routers.json, the routers registered at startup
+
+Run it from the project root whenever a route module is added, moved or
+removed (DEBUG runs walk app/api and do not need it).
+
+    python scripts/build-router-manifest.py
+    python scripts/build-router-manifest.py --check
+"""
+import argparse
+import json
+import sys
+
+sys.path.insert(0, ".")
+
+from app.api import API_DIRECTORY, MANIFEST_PATH, walk_routers  # noqa: E402
+
+
+def main(check: bool) -> int:
+    manifest = json.dumps(walk_routers(API_DIRECTORY), indent=2) + "\n"
+    current = MANIFEST_PATH.read_text() if MANIFEST_PATH.exists() else None
+    if check:
+        if current != manifest:
+            print(f"{MANIFEST_PATH} is out of date")
+            return 1
+        print(f"{MANIFEST_PATH} is up to date")
+        return 0
+
+    MANIFEST_PATH.write_text(manifest)
+    print(f"Wrote {MANIFEST_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--check", action="store_true", help="fail if the manifest is out of date"
+    )
+    args = parser.parse_args()
+    sys.exit(main(args.check))
@@ -0,0 +1,42 @@
+"""Diff, build and report the indexes declared on the models in app/models
+
+    APP_ENV=dev python scripts/indexes.py diff
+    APP_ENV=dev python scripts/indexes.py create
+    APP_ENV=dev python scripts/indexes.py apply --drop-undeclared
+    APP_ENV=dev python scripts/indexes.py report
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+sys.path.insert(0, ".")
+
+from bson import json_util  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.models import cls_documents, disconnect_mongoengine, init_mongoengine  # noqa
+from app.models.indexes import index_report, sync_indexes  # noqa: E402
+
+
+def main(command: str, drop_undeclared: bool, limit: int):
+    settings.INDEX_SYNC_MODE = "off"
+    asyncio.run(init_mongoengine(settings))
+    if command == "report":
+        report = index_report(cls_documents, limit=limit)
+        print(json.dumps(json.loads(json_util.dumps(report)), indent=2))
+    else:
+        mode = {"diff": "dry-run"}.get(command, command)
+        plans = sync_indexes(cls_documents, mode, drop_undeclared)
+        if not any(plans):
+            print("Indexes are up to date")
+    asyncio.run(disconnect_mongoengine())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["diff", "create", "apply", "report"])
+    parser.add_argument("--drop-undeclared", action="store_true")
+    parser.add_argument("--limit", type=int, default=20, help="collection scans")
+    args = parser.parse_args()
+    main(args.command, args.drop_undeclared, args.limit)
@@ -0,0 +1,4 @@
+import os
+
+# app.core.config picks the database name from APP_ENV at import time
+os.environ.setdefault("APP_ENV", "test")
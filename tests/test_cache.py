@@ -0,0 +1,75 @@
+from app.core.cache import MISSING, TTLCache
+
+
+def test_fill_stores_the_loaded_value():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    version = cache.reserve("a")
+
+    assert cache.fill("a", 1, version)
+    assert cache.get("a") == 1
+
+
+def test_fill_after_pop_is_dropped():
+    cache = TTLCache(maxsize=10, ttl=60)
+    version = cache.reserve("a")
+
+    # a write invalidates the key while the old value is being loaded
+    cache.pop("a")
+
+    assert not cache.fill("a", "old", version)
+    assert cache.get("a") is MISSING
+
+
+def test_pop_of_other_key_does_not_drop_fill():
+    cache = TTLCache(maxsize=10, ttl=60)
+    version = cache.reserve("a")
+
+    cache.pop("b")
+
+    assert cache.fill("a", 1, version)
+
+
+def test_failed_fill_releases_the_reservation():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    assert not cache.fill("a", MISSING, cache.reserve("a"))
+    assert cache._fills == {}
+
+
+def test_repository_cache_hit_is_not_a_db_call():
+    from bson import ObjectId
+
+    from app.core.metrics import DB_DURATION
+    from app.repository.base_repository import BaseRepository
+
+    id = ObjectId()
+
+    class QuerySet:
+        def as_pymongo(self):
+            return self
+
+        def with_id(self, id):
+            return {"_id": id}
+
+    class Model:
+        objects = QuerySet()
+        _from_son = staticmethod(dict)
+
+    def db_calls() -> float:
+        labels = {"model": "Model", "method": "get_by_id"}
+        return sum(
+            sample.value
+            for sample in DB_DURATION.collect()[0].samples
+            if sample.name.endswith("_count") and sample.labels == labels
+        )
+
+    repository = BaseRepository(Model)
+    repository.cache = TTLCache(maxsize=10, ttl=60)
+    before = db_calls()
+
+    assert repository.get_by_id(id) == {"_id": id}
+    assert repository.get_by_id(id, raw=True) == {"_id": id}
+
+    # only the miss reaches the database
+    assert db_calls() == before + 1
@@ -0,0 +1,135 @@
+import asyncio
+import gzip
+
+import pytest
+
+from app.core.compression import CompressionMiddleware, is_compressible, negotiate
+
+LEVELS = {"default": {"br": 4, "zstd": 3, "gzip": 6}}
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, preference, expected",
+    [
+        ("gzip", ["gzip"], "gzip"),
+        ("", ["gzip"], None),
+        ("identity", ["gzip"], None),
+        ("gzip;q=0", ["gzip"], None),
+        ("GZIP", ["gzip"], "gzip"),
+        ("*", ["gzip"], "gzip"),
+        ("*;q=0.5, gzip;q=0", ["gzip"], None),
+        ("gzip;q=bad", ["gzip"], None),
+        # unavailable encodings are skipped
+        ("unknown, gzip;q=0.1", ["unknown", "gzip"], "gzip"),
+    ],
+)
+def test_negotiate(accept_encoding, preference, expected):
+    assert negotiate(accept_encoding, preference) == expected
+
+
+def test_negotiate_prefers_client_quality_then_server_order(monkeypatch):
+    from app.core import compression
+
+    monkeypatch.setitem(compression.COMPRESSORS, "br", compression.GzipCompressor)
+    prefer_br = ["br", "gzip"]
+
+    assert negotiate("gzip, br;q=0.5", prefer_br) == "gzip"
+    assert negotiate("gzip, br", prefer_br) == "br"
+    assert negotiate("gzip, br", ["gzip", "br"]) == "gzip"
+
+
+def test_is_compressible():
+    assert is_compressible("application/json")
+    assert is_compressible("text/csv; charset=utf-8")
+    assert is_compressible("application/x-ndjson")
+    assert not is_compressible("image/png")
+    assert not is_compressible("")
+
+
+def app_sending(*bodies: bytes, content_type: str = "application/json"):
+    async def app(scope, receive, send):
+        headers = [(b"content-type", content_type.encode())]
+        if len(bodies) == 1:
+            headers.append((b"content-length", str(len(bodies[0])).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for i, body in enumerate(bodies):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": body,
+                    "more_body": i < len(bodies) - 1,
+                }
+            )
+
+    return app
+
+
+def call(app, accept_encoding: str = "gzip", minimum_size: int = 100) -> list[dict]:
+    middleware = CompressionMiddleware(
+        app, minimum_size, ["gzip"], LEVELS, static_paths=[]
+    )
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(middleware(scope, None, send))
+    return messages
+
+
+def headers(start: dict) -> dict:
+    return {name.decode(): value.decode() for name, value in start["headers"]}
+
+
+def test_body_below_minimum_size_is_sent_as_is():
+    start, body = call(app_sending(b"{}"))
+
+    assert "content-encoding" not in headers(start)
+    assert body["body"] == b"{}"
+
+
+def test_single_body_is_compressed_with_its_length():
+    data = b'{"name": "house"}' * 100
+    start, body = call(app_sending(data))
+
+    assert headers(start)["content-encoding"] == "gzip"
+    assert headers(start)["content-length"] == str(len(body["body"]))
+    assert headers(start)["vary"] == "Accept-Encoding"
+    assert gzip.decompress(body["body"]) == data
+
+
+def test_stream_is_compressed_chunk_by_chunk():
+    # a small first chunk is compressed too, more chunks may follow
+    chunks = [b"{}\n", b'{"name": "house"}\n' * 10, b""]
+    start, *bodies = call(app_sending(*chunks, content_type="application/x-ndjson"))
+
+    assert headers(start)["content-encoding"] == "gzip"
+    assert "content-length" not in headers(start)
+    assert [body["more_body"] for body in bodies] == [True, True, False]
+    # every chunk is flushed, a client can decode the stream as it arrives
+    assert all(body["body"] for body in bodies[:2])
+    assert gzip.decompress(b"".join(body["body"] for body in bodies)) == b"".join(
+        chunks
+    )
+
+
+def test_not_compressible_stream_is_passed_through():
+    chunks = [b"\x89PNG" * 100, b""]
+    start, *bodies = call(app_sending(*chunks, content_type="image/png"))
+
+    assert "content-encoding" not in headers(start)
+    assert [body["body"] for body in bodies] == chunks
+
+
+def test_no_accepted_encoding_is_passed_through():
+    data = b"{}" * 100
+    start, body = call(app_sending(data), accept_encoding="identity")
+
+    assert "content-encoding" not in headers(start)
+    assert body["body"] == data
@@ -0,0 +1,29 @@
+from app.core.db_monitoring import PoolMonitoringListener, RequestDBStats
+
+
+def test_cursor_batches_are_not_counted_as_commands():
+    stats = RequestDBStats("id", "GET", "/api/v1/house/export")
+    stats.commands[("find", "houses")] += 1
+    stats.commands[("getMore", "houses")] += 50
+
+    assert stats.count == 1
+    assert stats.summary()["by_command"] == {"getMore houses": 50, "find houses": 1}
+
+
+def test_only_checkouts_without_an_idle_connection_wait():
+    monitor = PoolMonitoringListener("test")
+    monitor.connection_created(None)
+
+    monitor.connection_check_out_started(None)
+    assert monitor.stats()["waiters"] == 0
+    monitor.connection_checked_out(None)
+
+    # the only connection is in use, the next checkout waits for a new one
+    monitor.connection_check_out_started(None)
+    assert monitor.stats()["waiters"] == 1
+    monitor.connection_created(None)
+    monitor.connection_checked_out(None)
+
+    stats = monitor.stats()
+    assert stats["waiters"] == 0
+    assert stats["checked_out"] == stats["checkouts"] == 2
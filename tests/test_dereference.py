@@ -0,0 +1,183 @@
+import datetime
+import json
+
+import pytest
+from bson import DBRef, ObjectId
+from pydantic import BaseModel
+
+from app.models.house_model import House
+from app.schemas.house_schema import ResponseHouse
+from app.utils import dereference as dereference_module
+from app.utils.dereference import dereference
+from app.utils.schema import DeDBRef
+
+
+class Listing(BaseModel):
+    house: DeDBRef[ResponseHouse]
+
+
+def house_son(**extra) -> dict:
+    """Raw document as `dereference` returns it"""
+    return {
+        "_id": ObjectId(),
+        "name": "Baan",
+        "name_normalized": "baan",
+        "name_ngrams": ["baa", "aan"],
+        "width": 1.0,
+        "height": 2.0,
+        "volume": 3.0,
+        "created_date": datetime.datetime(2023, 1, 1),
+        "updated_date": datetime.datetime(2023, 1, 1),
+        **extra,
+    }
+
+
+def test_dereferenced_dict_serializes_to_schema_fields():
+    son = house_son()
+
+    listing = Listing.model_validate({"house": son})
+
+    assert isinstance(listing.house, ResponseHouse)
+    expected = {
+        "house": {
+            "id": str(son["_id"]),
+            "name": "Baan",
+            "width": 1.0,
+            "height": 2.0,
+            "volume": 3.0,
+        }
+    }
+    assert listing.model_dump(mode="json", by_alias=True) == expected
+    assert json.loads(listing.model_dump_json(by_alias=True)) == expected
+
+
+def test_document_serializes_to_schema_fields():
+    son = house_son()
+    house = House._from_son(son)
+
+    listing = Listing.model_validate({"house": house})
+
+    assert set(listing.model_dump(by_alias=True)["house"]) == {
+        "id",
+        "name",
+        "width",
+        "height",
+        "volume",
+    }
+
+
+def test_schema_instance_is_kept():
+    house = ResponseHouse.model_validate(house_son())
+
+    assert Listing(house=house).house is house
+
+
+class FakeCollection:
+    def __init__(self, name: str, sons: list[dict], queries: list):
+        self.name = name
+        self.sons = {son["_id"]: son for son in sons}
+        self.queries = queries
+
+    def find(self, query: dict) -> list[dict]:
+        ids = query["_id"]["$in"]
+        self.queries.append((self.name, sorted(ids)))
+        return [self.sons[id] for id in ids if id in self.sons]
+
+
+class FakeDocument:
+    def __init__(self, collection: FakeCollection):
+        self.collection = collection
+
+    def _get_collection(self) -> FakeCollection:
+        return self.collection
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """owners -> pets -> toys, `find` calls are recorded in `queries`"""
+    queries = []
+    toy = {"_id": 1, "name": "ball"}
+    pets = [
+        {"_id": 10, "name": "cat", "toy": DBRef("toys", 1)},
+        {"_id": 11, "name": "dog", "toy": DBRef("toys", 1)},
+    ]
+    documents = {
+        "toys": FakeDocument(FakeCollection("toys", [toy], queries)),
+        "pets": FakeDocument(FakeCollection("pets", pets, queries)),
+    }
+    monkeypatch.setattr(
+        dereference_module, "document_for_collection", documents.get
+    )
+    return queries
+
+
+def owners() -> list[dict]:
+    return [
+        {"_id": "a", "pets": [DBRef("pets", 10), DBRef("pets", 11)]},
+        {"_id": "b", "pets": [DBRef("pets", 10)], "toy": DBRef("toys", 1)},
+    ]
+
+
+def test_one_query_per_collection_per_level(database):
+    items = dereference(owners(), depth=1)
+
+    assert sorted(database) == [("pets", [10, 11]), ("toys", [1])]
+    assert items[0]["pets"][0]["name"] == "cat"
+    assert items[1]["toy"] == {"_id": 1, "name": "ball"}
+
+
+def test_depth_1_keeps_nested_refs(database):
+    items = dereference(owners(), depth=1)
+
+    assert items[0]["pets"][1]["toy"] == DBRef("toys", 1)
+
+
+def test_depth_2_resolves_nested_refs(database):
+    items = dereference(owners(), depth=2)
+
+    assert items[0]["pets"][1]["toy"] == {"_id": 1, "name": "ball"}
+    # toys were resolved on the first level, not queried again
+    assert sorted(database) == [("pets", [10, 11]), ("toys", [1])]
+
+
+def test_depth_2_queries_each_level_once(database):
+    items = dereference([{"pet": DBRef("pets", 10)}], depth=2)
+
+    assert database == [("pets", [10]), ("toys", [1])]
+    assert items[0]["pet"]["toy"]["name"] == "ball"
+
+
+def test_dangling_and_unknown_refs_are_kept(database):
+    dangling, unknown = DBRef("pets", 99), DBRef("unknown", 1)
+
+    items = dereference([{"pet": dangling, "other": unknown}])
+
+    assert items == [{"pet": dangling, "other": unknown}]
+    assert database == [("pets", [99])]
+
+
+def test_items_without_refs_do_not_query(database):
+    items = [{"_id": 1, "name": "plain"}]
+
+    assert dereference(items, depth=2) == items
+    assert database == []
+
+
+def test_cycles_are_queried_once(monkeypatch):
+    queries = []
+    nodes = [
+        {"_id": 1, "next": DBRef("nodes", 2)},
+        {"_id": 2, "next": DBRef("nodes", 1)},
+    ]
+    collection = FakeCollection("nodes", nodes, queries)
+    monkeypatch.setattr(
+        dereference_module,
+        "document_for_collection",
+        {"nodes": FakeDocument(collection)}.get,
+    )
+
+    items = dereference([{"head": DBRef("nodes", 1)}], depth=3)
+
+    assert queries == [("nodes", [1]), ("nodes", [2])]
+    assert items[0]["head"]["next"]["_id"] == 2
+    assert items[0]["head"]["next"]["next"]["_id"] == 1
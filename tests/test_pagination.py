@@ -0,0 +1,121 @@
+import datetime
+
+import mongomock
+import pytest
+from bson import ObjectId
+from mongoengine import connect, disconnect
+
+from app.core.exceptions import ValidationError
+from app.core.pagination import (
+    CursorParams,
+    _keyset_query,
+    decode_cursor,
+    encode_cursor,
+    paginate_by_cursor,
+)
+from app.models.house_model import House
+
+START = datetime.datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def houses():
+    connect(
+        "test-pagination",
+        mongo_client_class=mongomock.MongoClient,
+        uuidRepresentation="standard",
+    )
+    # two houses per created_date, the id breaks the tie
+    items = [
+        House(
+            name=f"house {i}",
+            width=1.0,
+            height=1.0,
+            volume=1.0,
+            created_date=START + datetime.timedelta(seconds=i // 2),
+        ).save()
+        for i in range(7)
+    ]
+    yield [item.id for item in items]
+    House.drop_collection()
+    disconnect()
+
+
+def params(cursor=None, size=3) -> CursorParams:
+    return CursorParams(cursor=cursor, size=size)
+
+
+def ids(page: dict) -> list[ObjectId]:
+    return [item["_id"] for item in page["items"]]
+
+
+def test_cursor_round_trip():
+    values = [START, ObjectId()]
+
+    assert decode_cursor(encode_cursor("prev", values)) == ("prev", values)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64 !",
+        encode_cursor("next", [1])[:-2],
+        encode_cursor("sideways", [1]),
+        "eyJkIjogIm5leHQifQ",  # {"d": "next"}, no values
+    ],
+)
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValidationError):
+        decode_cursor(cursor)
+
+
+def test_keyset_query_compares_fields_in_order():
+    id = ObjectId()
+    query = _keyset_query(("created_date", "id"), [START, id], "gt").to_query(House)
+
+    assert query == {
+        "$or": [
+            {"created_date": {"$gt": START}},
+            {"created_date": START, "_id": {"$gt": id}},
+        ]
+    }
+
+
+def test_next_pages(houses):
+    queryset = House.objects.as_pymongo()
+
+    first = paginate_by_cursor(queryset, params())
+    assert ids(first) == houses[:3]
+    assert first["previous_page"] is None
+
+    second = paginate_by_cursor(queryset, params(first["next_page"]))
+    assert ids(second) == houses[3:6]
+    assert second["previous_page"] is not None
+
+    last = paginate_by_cursor(queryset, params(second["next_page"]))
+    assert ids(last) == houses[6:]
+    assert last["next_page"] is None
+
+
+def test_previous_pages(houses):
+    queryset = House.objects.as_pymongo()
+    first = paginate_by_cursor(queryset, params())
+    second = paginate_by_cursor(queryset, params(first["next_page"]))
+    last = paginate_by_cursor(queryset, params(second["next_page"]))
+
+    back = paginate_by_cursor(queryset, params(last["previous_page"]))
+    assert ids(back) == houses[3:6]
+    assert back["next_page"] is not None
+
+    start = paginate_by_cursor(queryset, params(back["previous_page"]))
+    assert ids(start) == houses[:3]
+    # the first page has no previous page once reached backwards
+    assert start["previous_page"] is None
+    assert start["next_page"] is not None
+
+
+def test_cursor_of_other_ordering_is_rejected(houses):
+    cursor = encode_cursor("next", [START])
+
+    with pytest.raises(ValidationError):
+        paginate_by_cursor(House.objects, params(cursor))
@@ -0,0 +1,132 @@
+import time
+
+from starlette.requests import Request
+
+from app.core.query_cache import QueryCache, RedisBackend
+from app.utils.search import search_key
+
+
+class FakeRedis:
+    """Local stand-in for the `redis.Redis` methods used by `RedisBackend`"""
+
+    def __init__(self):
+        self.data: dict[str, tuple[bytes, float | None]] = {}
+
+    def get(self, key: str) -> bytes | None:
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def set(self, key: str, value: bytes, px: int | None = None) -> None:
+        expires_at = time.monotonic() + px / 1000 if px is not None else None
+        self.data[key] = (value, expires_at)
+
+    def incr(self, key: str) -> int:
+        value = int(self.get(key) or 0) + 1
+        self.data[key] = (str(value).encode(), None)
+        return value
+
+
+def make_request(headers: dict[str, str] | None = None) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/house/",
+            "headers": [
+                (name.lower().encode(), value.encode())
+                for name, value in (headers or {}).items()
+            ],
+        }
+    )
+
+
+PARAMS = {"find": {"name": "baan"}, "limit": 50, "offset": 0}
+
+
+def make_cache(ttl: float = 60) -> QueryCache:
+    return QueryCache(RedisBackend(FakeRedis(), ttl=ttl))
+
+
+def test_miss_then_hit():
+    cache = make_cache()
+    key = cache.key("/house/", "houses", PARAMS)
+
+    assert cache.response(make_request(), key) is None
+
+    cache.set(key, 'W/"1"', b'{"items":[]}')
+    response = cache.response(make_request(), key)
+
+    assert response.status_code == 200
+    assert response.body == b'{"items":[]}'
+    assert response.headers["etag"] == 'W/"1"'
+    assert response.media_type == "application/json"
+
+
+def test_matching_if_none_match_is_304():
+    cache = make_cache()
+    key = cache.key("/house/", "houses", PARAMS)
+    cache.set(key, 'W/"1"', b'{"items":[]}')
+
+    response = cache.response(make_request({"If-None-Match": 'W/"1"'}), key)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == 'W/"1"'
+    assert response.body == b""
+
+    other = cache.response(make_request({"If-None-Match": 'W/"2"'}), key)
+    assert other.status_code == 200
+
+
+def test_bump_moves_to_new_keys():
+    cache = make_cache()
+    key = cache.key("/house/", "houses", PARAMS)
+    cache.set(key, 'W/"1"', b"{}")
+
+    cache.bump("houses")
+    new_key = cache.key("/house/", "houses", PARAMS)
+
+    assert new_key != key
+    assert cache.response(make_request(), new_key) is None
+    # other collections keep their entries
+    assert cache.key("/house/", "other", PARAMS) == cache.key(
+        "/house/", "other", PARAMS
+    )
+
+
+def test_versions_are_shared_between_backends_of_one_server():
+    client = FakeRedis()
+    worker_a = QueryCache(RedisBackend(client, ttl=60))
+    worker_b = QueryCache(RedisBackend(client, ttl=60))
+    key = worker_a.key("/house/", "houses", PARAMS)
+    worker_a.set(key, 'W/"1"', b"{}")
+
+    assert worker_b.response(make_request(), key) is not None
+
+    worker_b.bump("houses")
+    assert worker_a.key("/house/", "houses", PARAMS) != key
+
+
+def test_entries_expire_after_ttl():
+    cache = make_cache(ttl=0.01)
+    key = cache.key("/house/", "houses", PARAMS)
+    cache.set(key, 'W/"1"', b"{}")
+
+    time.sleep(0.02)
+
+    assert cache.response(make_request(), key) is None
+
+
+def test_key_ignores_param_order():
+    cache = make_cache()
+
+    assert cache.key("/house/", "houses", {"a": 1, "b": 2}) == cache.key(
+        "/house/", "houses", {"b": 2, "a": 1}
+    )
+
+
+def test_search_key_normalizes_name():
+    assert search_key("  Baan ", "regex") == search_key("baan", "regex")
+    assert search_key("ＢＡＡＮ", "prefix") == search_key("baan", "prefix")
@@ -0,0 +1,20 @@
+from app.utils.search import with_search_fields
+
+
+def test_regex_mode_derives_nothing():
+    data = {"name": "Baan"}
+    assert with_search_fields(("name",), data, "regex") == {"name": "Baan"}
+
+
+def test_prefix_mode_derives_normalized_only():
+    assert with_search_fields(("name",), {"set__name": "Baan"}, "prefix") == {
+        "set__name": "Baan",
+        "set__name_normalized": "baan",
+    }
+
+
+def test_ngram_mode_derives_normalized_and_ngrams():
+    data = with_search_fields(("name",), {"name": "Baan", "width": 1.0}, "ngram")
+    assert data["name_normalized"] == "baan"
+    assert "baa" in data["name_ngrams"] and "aan" in data["name_ngrams"]
+    assert data["width"] == 1.0